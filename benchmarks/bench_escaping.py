@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+#   Copyright 2021 Kaede Hoshikawa
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+Compare the built-in escape functions with the standard library functions
+they replace.
+
+Usage: python benchmarks/bench_escaping.py
+"""
+
+from typing import Callable, Sequence, Tuple
+import html
+import timeit
+import urllib.parse
+
+from sketchbook.escaping import builtin_escape_fns
+
+_SAMPLES = [
+    ("short, clean", "Hello, world"),
+    ("short, escaped", "<b>Hello</b>"),
+    ("long, clean", "Lorem ipsum dolor sit amet " * 200),
+    ("long, one escaped", "Lorem ipsum dolor sit amet " * 200 + "&"),
+    ("long, escaped", "<a href='#'>\"Lorem\" & ipsum</a>" * 200),
+]
+
+_URL_SAMPLES = [
+    ("short, clean", "sketchbook"),
+    ("short, escaped", "a&redirect=https://www.example.com/"),
+    ("long, clean", "sketchbook" * 200),
+    ("long, escaped", "John Smith & Co." * 200),
+]
+
+
+def _bench(
+    name: str,
+    fns: Sequence[Tuple[str, Callable[[str], str]]],
+    samples: Sequence[Tuple[str, str]],
+    number: int = 20_000,
+) -> None:
+    print(f"{name}:")
+
+    for sample_name, sample in samples:
+        results = []
+
+        for fn_name, fn in fns:
+            elapsed = timeit.timeit(lambda: fn(sample), number=number)
+            results.append(f"{fn_name}: {elapsed / number * 1e6:8.3f}us")
+
+        print(f"    {sample_name:>17}  " + "  ".join(results))
+
+
+def main() -> None:
+    _bench(
+        "HTML",
+        [("html.escape", html.escape), ("html", builtin_escape_fns["html"])],
+        _SAMPLES,
+    )
+    _bench(
+        "URL",
+        [
+            ("quote_plus", urllib.parse.quote_plus),
+            ("url", builtin_escape_fns["url"]),
+        ],
+        _URL_SAMPLES,
+    )
+    _bench(
+        "URL without plus",
+        [
+            ("quote", urllib.parse.quote),
+            ("url_without_plus", builtin_escape_fns["url_without_plus"]),
+        ],
+        _URL_SAMPLES,
+    )
+
+
+if __name__ == "__main__":
+    main()
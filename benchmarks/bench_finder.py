@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+#   Copyright 2021 Kaede Hoshikawa
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+Measure how concurrent draws behave while other sketches are being loaded.
+
+Usage: python benchmarks/bench_finder.py
+"""
+
+import asyncio
+import concurrent.futures
+import os
+import tempfile
+import time
+
+from sketchbook import AsyncioSketchContext, SyncSketchFinder
+
+
+class _SlowSketchFinder(SyncSketchFinder):
+    """
+    Simulate a slow storage with 10ms per read.
+    """
+
+    async def _load_sketch_content(self, abs_skt_path: str) -> str:
+        await asyncio.sleep(0.01)
+
+        return await super()._load_sketch_content(abs_skt_path)
+
+
+async def bench_concurrent_draws() -> None:
+    print("Concurrent draws (10ms per read):")
+
+    with tempfile.TemporaryDirectory() as root_path:
+        for i in range(100):
+            with open(os.path.join(root_path, f"{i}.html"), "w") as f:
+                f.write(f'<% include "header.html" %>{i}')
+
+        with open(os.path.join(root_path, "header.html"), "w") as f:
+            f.write("<header></header>")
+
+        for concurrency in (10, 100, 1_000):
+            finder = _SlowSketchFinder(root_path)
+            await (await finder.find("header.html")).draw()
+
+            async def _draw(i: int) -> str:
+                skt = await finder.find(f"{i % 100}.html")
+
+                return await skt.draw()
+
+            start = time.perf_counter()
+            await asyncio.gather(*[_draw(i) for i in range(concurrency)])
+            elapsed = time.perf_counter() - start
+
+            print(f"    {concurrency:>9}: {elapsed * 1000:10.3f}ms")
+
+
+async def bench_cold_draw() -> None:
+    print("Cold draw (10ms per read):")
+
+    with tempfile.TemporaryDirectory() as root_path:
+        for fan_out in (1, 10, 50):
+            with open(os.path.join(root_path, "index.html"), "w") as f:
+                for i in range(fan_out):
+                    f.write(f'<% include "{i}.html" %>')
+
+            for i in range(fan_out):
+                with open(os.path.join(root_path, f"{i}.html"), "w") as f:
+                    f.write(str(i))
+
+            finder = _SlowSketchFinder(root_path)
+
+            start = time.perf_counter()
+            await (await finder.find("index.html")).draw()
+            elapsed = time.perf_counter() - start
+
+            print(f"    {fan_out:>9}: {elapsed * 1000:10.3f}ms")
+
+
+async def bench_loop_stall() -> None:
+    print("Longest event loop stall while finding a large sketch:")
+
+    async def _tick(stalls: list) -> None:
+        while True:
+            tick_at = time.perf_counter()
+            await asyncio.sleep(0)
+            stalls.append(time.perf_counter() - tick_at)
+
+    with tempfile.TemporaryDirectory() as root_path:
+        with open(os.path.join(root_path, "large.html"), "w") as f:
+            f.write("<% for i in range(n) %><%= i %><% end %>\n" * 2_000)
+
+        with concurrent.futures.ThreadPoolExecutor() as thread_executor:
+            process_executor = concurrent.futures.ProcessPoolExecutor()
+
+            for name, skt_ctx in (
+                ("loop", AsyncioSketchContext()),
+                (
+                    "thread",
+                    AsyncioSketchContext(compile_executor=thread_executor),
+                ),
+                (
+                    "process",
+                    AsyncioSketchContext(compile_executor=process_executor),
+                ),
+            ):
+                stalls: list = []
+                ticker = asyncio.create_task(_tick(stalls))
+                await asyncio.sleep(0)
+
+                finder = SyncSketchFinder(root_path, skt_ctx=skt_ctx)
+                await finder.find("large.html")
+                await asyncio.sleep(0)
+
+                ticker.cancel()
+                print(f"    {name:>9}: {max(stalls) * 1000:10.3f}ms")
+
+            process_executor.shutdown()
+
+
+async def bench_preload() -> None:
+    print("Preload (200 sketches):")
+
+    with tempfile.TemporaryDirectory() as root_path:
+        for i in range(200):
+            with open(os.path.join(root_path, f"{i}.html"), "w") as f:
+                f.write("<% for i in range(n) %><%= i %><% end %>\n" * 200)
+
+        finder = SyncSketchFinder(root_path)
+        report = await finder.preload("*.html")
+        print(f"    {'loop':>9}: {report.elapsed * 1000:10.3f}ms")
+
+        with concurrent.futures.ProcessPoolExecutor() as executor:
+            finder = SyncSketchFinder(root_path)
+            report = await finder.preload("*.html", executor=executor)
+            print(f"    {'processes':>9}: {report.elapsed * 1000:10.3f}ms")
+
+
+async def main() -> None:
+    await bench_concurrent_draws()
+    await bench_cold_draw()
+    await bench_loop_stall()
+    await bench_preload()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+#   Copyright 2021 Kaede Hoshikawa
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+Measure how drawing scales with the output size and the include depth.
+
+Usage: python benchmarks/bench_output.py
+"""
+
+from typing import Awaitable, Callable
+import asyncio
+import time
+
+from sketchbook import AsyncioSketchContext, DictSketchFinder, Sketch
+
+
+async def _timeit(fn: Callable[[], Awaitable[str]], number: int) -> float:
+    start = time.perf_counter()
+
+    for _ in range(number):
+        await fn()
+
+    return (time.perf_counter() - start) / number
+
+
+async def bench_output_size() -> None:
+    print("Output size (number of writes):")
+
+    skt = Sketch(
+        "<% for i in range(n) %><%= s %><% end %>",
+        skt_ctx=AsyncioSketchContext(),
+    )
+
+    for n in (1_000, 10_000, 100_000, 1_000_000):
+        elapsed = await _timeit(lambda: skt.draw(n=n, s="0123456789"), 3)
+        print(f"    {n:>9}: {elapsed * 1000:10.3f}ms")
+
+
+async def bench_include_depth() -> None:
+    print("Include depth (10KB per sketch):")
+
+    for depth in (1, 10, 50, 100, 200):
+        finder = DictSketchFinder(
+            {
+                f"{i}.html": "x" * 10_000
+                + (f'<% include "{i + 1}.html" %>' if i + 1 < depth else "")
+                for i in range(depth)
+            }
+        )
+        skt = await finder.find("0.html")
+
+        elapsed = await _timeit(skt.draw, 20)
+        print(f"    {depth:>9}: {elapsed * 1000:10.3f}ms")
+
+
+async def main() -> None:
+    await bench_output_size()
+    await bench_include_depth()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
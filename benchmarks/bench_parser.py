@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+#   Copyright 2021 Kaede Hoshikawa
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+Measure the time to parse large sketches.
+
+Usage: python benchmarks/bench_parser.py [SOURCE_PATH ...]
+
+If the paths of other source trees of Sketchbook are given, such as a
+checkout of a previous release, the sketches are also parsed by them in
+subprocesses for comparison.
+"""
+
+from typing import List
+import os
+import subprocess
+import sys
+import time
+
+from sketchbook import AsyncioSketchContext, Sketch
+import sketchbook
+
+_TAG = (
+    '<div class="item"><a href="/items/<%u= item.id %>"><%= item.name %>'
+    "</a><% if item.tags %><span><%= item.tags %></span><% end %></div>"
+)
+
+
+def _timeit(content: str, number: int) -> float:
+    skt_ctx = AsyncioSketchContext()
+    start = time.perf_counter()
+
+    for _ in range(number):
+        Sketch(content, skt_ctx=skt_ctx)
+
+    return (time.perf_counter() - start) / number
+
+
+def bench() -> None:
+    for name, sep in (("Single line", ""), ("Multiple lines", "\n")):
+        print(f"{name}:")
+
+        for n in (100, 1_000, 10_000, 30_000):
+            content = "<% for item in items %>" + sep.join([_TAG] * n)
+            content += "<% end %>"
+
+            elapsed = _timeit(content, 3)
+            print(
+                f"    {len(content) / 1024 / 1024:7.2f}MB: "
+                f"{elapsed * 1000:10.3f}ms"
+            )
+
+
+def main(argv: List[str]) -> None:
+    print(f"Sketchbook in {os.path.dirname(sketchbook.__file__)}:")
+    bench()
+
+    for source_path in argv:
+        print(flush=True)
+        subprocess.run(
+            [sys.executable, __file__],
+            env={**os.environ, "PYTHONPATH": os.path.abspath(source_path)},
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -15,11 +15,10 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
-from typing import Any
-
-from . import _version, context, exceptions, finders, runtime, sketch
+from . import _version, context, escaping, exceptions, finders, runtime, sketch
 from ._version import *  # noqa: F403
 from .context import *  # noqa: F403
+from .escaping import *  # noqa: F403
 from .exceptions import *  # noqa: F403
 from .finders import *  # noqa: F403
 from .runtime import *  # noqa: F403
@@ -32,21 +31,8 @@ SketchContext = deprecated_attr(
     "`SketchContext` is deprecated, use `AsyncioSketchContext` instead.",
 )
 
-try:
-    from .finders import AsyncSketchFinder as _SketchFinder
-
-except ImportError:
-
-    class _SketchFinder:  # type: ignore  # noqa: SIM119
-        def __init__(self, *args: Any, **kwargs: Any) -> None:
-            raise RuntimeError(
-                "Aiofiles is not installed. "
-                "Please install aiofiles before using AsyncSketchFinder."
-            )
-
-
 SketchFinder = deprecated_attr(
-    _SketchFinder,
+    AsyncSketchFinder,  # noqa: F405
     __name__,
     "`SketchFinder` is deprecated, use `AsyncSketchFinder` instead.",
 )
@@ -54,6 +40,7 @@ SketchFinder = deprecated_attr(
 __all__ = (
     _version.__all__
     + context.__all__
+    + escaping.__all__
     + exceptions.__all__
     + finders.__all__
     + runtime.__all__
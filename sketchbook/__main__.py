@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+#   Copyright 2021 Kaede Hoshikawa
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+from typing import List, Optional
+import argparse
+import sys
+
+from . import manifest
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m sketchbook")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    manifest_parser = subparsers.add_parser(
+        "manifest", help="build the manifest of a directory of sketches"
+    )
+    manifest_parser.add_argument("root_path")
+    manifest_parser.add_argument("manifest_path")
+
+    args = parser.parse_args(argv)
+
+    skt_manifest = manifest.SketchManifest.build(args.root_path)
+    skt_manifest.dump(args.manifest_path)
+
+    print(
+        f"Written {len(skt_manifest.entries)} sketches "
+        f"to {args.manifest_path}."
+    )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+#   Copyright 2021 Kaede Hoshikawa
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+from typing import Any, Dict, Optional, Set
+import ctypes
+import os
+import struct
+import sys
+
+__all__ = ["is_available", "InotifyWatcher"]
+
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+
+# Editors either write files in place or replace them with renames, so
+# directories are watched instead of the files.
+_WATCH_MASK = (
+    _IN_MODIFY
+    | _IN_ATTRIB
+    | _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+    | _IN_DELETE_SELF
+    | _IN_MOVE_SELF
+    | _IN_ONLYDIR
+)
+
+# struct inotify_event {int wd; uint32_t mask, cookie, len; char name[];}
+_EVENT_HEADER = struct.Struct("iIII")
+
+_libc: Optional[Any] = None
+
+if sys.platform.startswith("linux"):
+    try:
+        _libc = ctypes.CDLL(None, use_errno=True)
+        _libc.inotify_init1
+        _libc.inotify_add_watch
+
+    except (OSError, AttributeError):  # pragma: no cover
+        _libc = None
+
+
+def is_available() -> bool:
+    """
+    Return :code:`True` if inotify can be used on the current platform.
+    """
+    return _libc is not None
+
+
+class InotifyWatcher:
+    """
+    Watch directories for file changes with inotify.
+
+    The inotify file descriptor is non-blocking, so changes are polled by
+    :meth:`read_changed_paths` rather than waited for.
+    """
+
+    def __init__(self) -> None:
+        assert _libc is not None, "inotify is not available."
+
+        self._fd = -1
+        fd = _libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+
+        if fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+
+        self._fd = fd
+
+        self._wd_dirs: Dict[int, str] = {}
+        self._watched_dirs: Set[str] = set()
+
+    def watch_dir(self, dir_path: str) -> None:
+        """
+        Start watching a directory, if it is not watched.
+        """
+        if dir_path in self._watched_dirs:
+            return
+
+        assert _libc is not None
+
+        wd = _libc.inotify_add_watch(
+            self._fd, os.fsencode(dir_path), _WATCH_MASK
+        )
+
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), dir_path)
+
+        self._wd_dirs[wd] = dir_path
+        self._watched_dirs.add(dir_path)
+
+    def is_watched(self, dir_path: str) -> bool:
+        return dir_path in self._watched_dirs
+
+    def read_changed_paths(self) -> Optional[Set[str]]:
+        """
+        Read the paths changed since the last call without blocking.
+
+        Return :code:`None` if events were lost because of a queue
+        overflow, and every watched file should be considered changed.
+        """
+        changed_paths: Set[str] = set()
+
+        while True:
+            try:
+                buf = os.read(self._fd, 65536)
+
+            except BlockingIOError:
+                return changed_paths
+
+            pos = 0
+
+            while pos < len(buf):
+                wd, mask, _, name_len = _EVENT_HEADER.unpack_from(buf, pos)
+                pos += _EVENT_HEADER.size
+
+                name = buf[pos : pos + name_len].rstrip(b"\0")
+                pos += name_len
+
+                if mask & _IN_Q_OVERFLOW:
+                    return None
+
+                dir_path = self._wd_dirs.get(wd)
+
+                if dir_path is None:
+                    continue
+
+                if mask & _IN_IGNORED:
+                    # The directory has been removed or unmounted.
+                    del self._wd_dirs[wd]
+                    self._watched_dirs.discard(dir_path)
+
+                    continue
+
+                if name:
+                    changed_paths.add(
+                        os.path.join(dir_path, os.fsdecode(name))
+                    )
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def __del__(self) -> None:
+        self.close()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+#   Copyright 2021 Kaede Hoshikawa
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+from types import CodeType
+from typing import Optional
+import contextlib
+import hashlib
+import importlib.util
+import marshal
+import os
+import tempfile
+import typing
+import warnings
+
+from ._version import __version__
+
+if typing.TYPE_CHECKING:
+    from . import context  # noqa: F401
+    from . import sketch  # noqa: F401
+
+__all__ = ["BytecodeCache"]
+
+
+class BytecodeCache:
+    """
+    A directory of compiled sketches, shared by processes.
+
+    Entries are keyed by the hash of the sketch content, the path of the
+    sketch, the version of Sketchbook, the magic number of the Python
+    interpreter and the statements and escape functions of the sketch
+    context. They are written atomically, so concurrent processes can share
+    the same directory.
+    """
+
+    def __init__(self, cache_dir: str) -> None:
+        self._cache_dir = os.path.abspath(cache_dir)
+
+        os.makedirs(self._cache_dir, exist_ok=True)
+
+    @property
+    def cache_dir(self) -> str:
+        return self._cache_dir
+
+    def _get_cache_path(self, skt: "sketch.Sketch") -> str:
+        skt_ctx: "context.BaseSketchContext" = skt._ctx
+
+        key_hash = hashlib.sha256()
+
+        for key_part in (
+            __version__,
+            skt._path,
+            *(
+                f"{stmt_cls.__module__}.{stmt_cls.__qualname__}"
+                for stmt_cls in skt_ctx.stmt_classes
+            ),
+            *skt_ctx.escape_fns.keys(),
+            skt._content,
+        ):
+            key_hash.update(key_part.encode("utf-8", "surrogatepass"))
+            key_hash.update(b"\0")
+
+        key_hash.update(importlib.util.MAGIC_NUMBER)
+
+        return os.path.join(self._cache_dir, f"{key_hash.hexdigest()}.pyc")
+
+    def load(self, skt: "sketch.Sketch") -> Optional[CodeType]:
+        """
+        Load the compiled code of the sketch.
+
+        Returns :code:`None` if the sketch is not cached.
+        """
+        try:
+            with open(self._get_cache_path(skt), "rb") as f:
+                cached = f.read()
+
+        except OSError:
+            return None
+
+        magic_len = len(importlib.util.MAGIC_NUMBER)
+
+        if cached[:magic_len] != importlib.util.MAGIC_NUMBER:
+            return None
+
+        try:
+            code = marshal.loads(cached[magic_len:])
+
+        except (EOFError, ValueError, TypeError):
+            return None
+
+        return code if isinstance(code, CodeType) else None
+
+    def store(self, skt: "sketch.Sketch", code: CodeType) -> None:
+        """
+        Store the compiled code of the sketch.
+
+        Failing to write the cache only emits a warning.
+        """
+        try:
+            fd, tmp_path = tempfile.mkstemp(
+                dir=self._cache_dir, prefix=".", suffix=".tmp"
+            )
+
+        except OSError as e:
+            warnings.warn(f"Failed to write bytecode cache: {e}.")
+            return
+
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(importlib.util.MAGIC_NUMBER)
+                marshal.dump(code, f)
+
+            # Readers either see the old file or the complete new one.
+            os.replace(tmp_path, self._get_cache_path(skt))
+
+        except OSError as e:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp_path)
+
+            warnings.warn(f"Failed to write bytecode cache: {e}.")
@@ -15,16 +15,31 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
-from typing import Any, Callable, Mapping, Optional, Sequence, Type
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Type,
+    TypeVar,
+)
 import abc
 import asyncio
+import concurrent.futures
 import types
 import warnings
 
-from . import escaping, statements
+from . import bytecode, escaping, statements
 
 __all__ = ["BaseSketchContext", "AsyncioSketchContext"]
 
+_T = TypeVar("_T")
+
 
 class BaseSketchContext(abc.ABC):
     """
@@ -35,16 +50,41 @@ class BaseSketchContext(abc.ABC):
 
     :arg cache_sketches: If :code:`True`, :class:`.BaseSketchFinder` will
         cache sketches. Default: :code:`True`.
+    :arg max_cached_sketches: The maximum number of sketches cached by each
+        :class:`.BaseSketchFinder`. The least recently used sketches are
+        evicted first. Default: :code:`None` (Unlimited).
+    :arg max_cached_bytes: The maximum estimated size in bytes of sketches
+        cached by each :class:`.BaseSketchFinder`, including the source and
+        the compiled code. Default: :code:`None` (Unlimited).
+    :arg auto_reload: If :code:`True`, :class:`.BaseSketchFinder` will
+        check whether cached sketches have been changed and reload the changed
+        ones. Default: :code:`False`.
+    :arg auto_reload_interval: The minimum interval in seconds between two
+        checks of the same sketch, or two reads of the changes watched by
+        inotify. Default: :code:`1.0`.
     :arg source_encoding: The encoding of the source of sketches if passed
         as bytestring. Default: :code:`utf-8`.
     :arg custom_escape_fns: Dictionary containing custom escape functions.
         Functions in this dictionary will override the ones with the same name
         in the built-in escape functions. Default: :code:`{}`.
+    :arg bytecode_cache_dir: If set, compiled sketches will be cached in this
+        directory and reused by other processes and future runs.
+        Default: :code:`None`.
+    :arg compile_executor: If set, :class:`.BaseSketchFinder` will parse and
+        compile sketches in this executor instead of the event loop, and
+        raise the errors of compilation when finding sketches. A
+        :class:`concurrent.futures.ProcessPoolExecutor` compiles sketches
+        with the built-in statements. Default: :code:`None`.
+    :arg thread_safe: If :code:`True`, a :class:`.BaseSketchFinder` with this
+        context can be shared by threads running their own event loops, and
+        its cached sketches are shared by all the threads.
+        Default: :code:`False`.
 
     Built-in Escape Functions:
 
     - :code:`default`, :code:`h`, and :code:`html`:
-        Short hand for :func:`html.escape`.
+        Short hand for :func:`html.escape`. :class:`.EscapedStr` is output
+        as is.
     - :code:`r` and :code:`raw`:
         Output the input with no modification.
     - :code:`j` and :code:`json`:
@@ -59,8 +99,15 @@ class BaseSketchContext(abc.ABC):
         self,
         *,
         cache_sketches: bool = True,
+        max_cached_sketches: Optional[int] = None,
+        max_cached_bytes: Optional[int] = None,
+        auto_reload: bool = False,
+        auto_reload_interval: float = 1.0,
         source_encoding: str = "utf-8",
         custom_escape_fns: Optional[Mapping[str, Callable[[Any], str]]] = None,
+        bytecode_cache_dir: Optional[str] = None,
+        compile_executor: Optional[concurrent.futures.Executor] = None,
+        thread_safe: bool = False,
     ) -> None:
 
         self._source_encoding = source_encoding
@@ -78,6 +125,64 @@ class BaseSketchContext(abc.ABC):
         self._stmt_classes.append(OutputStmt)
 
         self._cache_sketches = cache_sketches
+        self._max_cached_sketches = max_cached_sketches
+        self._max_cached_bytes = max_cached_bytes
+
+        self._auto_reload = auto_reload
+        self._auto_reload_interval = auto_reload_interval
+
+        self._bytecode_cache = (
+            bytecode.BytecodeCache(bytecode_cache_dir)
+            if bytecode_cache_dir is not None
+            else None
+        )
+
+        self._compile_executor = compile_executor
+
+        self._thread_safe = thread_safe
+
+    def _build_stmt_index(self) -> None:
+        """
+        Index statement classes by their keywords, so a statement is only
+        tried with the classes that can match it.
+
+        Statement classes without keywords are tried on every statement.
+        The order of :code:`stmt_classes` is kept in each entry.
+
+        The index is built upon the first statement parsed, so subclasses
+        overriding :code:`stmt_classes` are indexed after initialization.
+        """
+        freeform_stmt_classes: List[Type[statements.Statement]] = []
+        stmt_index: Dict[str, List[Type[statements.Statement]]] = {}
+
+        for stmt_cls in self.stmt_classes:
+            keywords = stmt_cls._get_keywords()
+
+            if keywords is None:
+                freeform_stmt_classes.append(stmt_cls)
+
+                for indexed_classes in stmt_index.values():
+                    indexed_classes.append(stmt_cls)
+
+                continue
+
+            for keyword in keywords:
+                if keyword not in stmt_index:
+                    stmt_index[keyword] = list(freeform_stmt_classes)
+
+                if stmt_cls not in stmt_index[keyword]:
+                    stmt_index[keyword].append(stmt_cls)
+
+        self._freeform_stmt_classes = tuple(freeform_stmt_classes)
+        self._stmt_index = {k: tuple(v) for k, v in stmt_index.items()}
+
+    def _get_stmt_classes(
+        self, keyword: str
+    ) -> Sequence[Type[statements.Statement]]:
+        if not hasattr(self, "_stmt_index"):
+            self._build_stmt_index()
+
+        return self._stmt_index.get(keyword, self._freeform_stmt_classes)
 
     @property
     def source_encoding(self) -> str:
@@ -95,6 +200,58 @@ class BaseSketchContext(abc.ABC):
     def cache_sketches(self) -> bool:
         return self._cache_sketches
 
+    @property
+    def max_cached_sketches(self) -> Optional[int]:
+        return self._max_cached_sketches
+
+    @property
+    def max_cached_bytes(self) -> Optional[int]:
+        return self._max_cached_bytes
+
+    @property
+    def auto_reload(self) -> bool:
+        return self._auto_reload
+
+    @property
+    def auto_reload_interval(self) -> float:
+        return self._auto_reload_interval
+
+    @property
+    def bytecode_cache_dir(self) -> Optional[str]:
+        if self._bytecode_cache is None:
+            return None
+
+        return self._bytecode_cache.cache_dir
+
+    @property
+    def compile_executor(self) -> Optional[concurrent.futures.Executor]:
+        return self._compile_executor
+
+    @property
+    def thread_safe(self) -> bool:
+        return self._thread_safe
+
+    async def _gather(
+        self, aws: Iterable[Awaitable[_T]]
+    ) -> List[_T]:  # pragma: no cover
+        """
+        Run the awaitables concurrently with the asynchronous library of the
+        context, and return their results in order.
+        """
+        raise NotImplementedError
+
+    async def _run_in_executor(
+        self,
+        executor: Optional[concurrent.futures.Executor],
+        fn: Callable[..., _T],
+        *args: Any,
+    ) -> _T:  # pragma: no cover
+        """
+        Run :code:`fn` in the executor, or a thread if :code:`executor` is
+        :code:`None`, with the asynchronous library of the context.
+        """
+        raise NotImplementedError
+
 
 class AsyncioSketchContext(BaseSketchContext):
     """
@@ -110,14 +267,28 @@ class AsyncioSketchContext(BaseSketchContext):
         self,
         *,
         cache_sketches: bool = True,
+        max_cached_sketches: Optional[int] = None,
+        max_cached_bytes: Optional[int] = None,
+        auto_reload: bool = False,
+        auto_reload_interval: float = 1.0,
         source_encoding: str = "utf-8",
         custom_escape_fns: Optional[Mapping[str, Callable[[Any], str]]] = None,
+        bytecode_cache_dir: Optional[str] = None,
+        compile_executor: Optional[concurrent.futures.Executor] = None,
+        thread_safe: bool = False,
         loop: Optional[asyncio.AbstractEventLoop] = None,
     ) -> None:
         super().__init__(
             cache_sketches=cache_sketches,
+            max_cached_sketches=max_cached_sketches,
+            max_cached_bytes=max_cached_bytes,
+            auto_reload=auto_reload,
+            auto_reload_interval=auto_reload_interval,
             source_encoding=source_encoding,
             custom_escape_fns=custom_escape_fns,
+            bytecode_cache_dir=bytecode_cache_dir,
+            compile_executor=compile_executor,
+            thread_safe=thread_safe,
         )
 
         if loop is not None:
@@ -132,9 +303,21 @@ class AsyncioSketchContext(BaseSketchContext):
         """
         return asyncio.get_running_loop()
 
+    async def _gather(self, aws: Iterable[Awaitable[_T]]) -> List[_T]:
+        return list(await asyncio.gather(*aws))
+
+    async def _run_in_executor(
+        self,
+        executor: Optional[concurrent.futures.Executor],
+        fn: Callable[..., _T],
+        *args: Any,
+    ) -> _T:
+        return await self.loop.run_in_executor(executor, fn, *args)
+
 
 try:
-    import curio  # noqa: F401
+    import curio
+    import curio.workers
 
 except ImportError:
     pass
@@ -148,6 +331,23 @@ else:
         library.
         """
 
-        pass
+        async def _gather(self, aws: Iterable[Awaitable[_T]]) -> List[_T]:
+            async with curio.TaskGroup() as g:
+                tasks = [await g.spawn(aw) for aw in aws]
+
+            return [task.result for task in tasks]
+
+        async def _run_in_executor(
+            self,
+            executor: Optional[concurrent.futures.Executor],
+            fn: Callable[..., _T],
+            *args: Any,
+        ) -> _T:
+            if executor is None:
+                return await curio.run_in_thread(fn, *args)  # type: ignore
+
+            return await curio.workers.run_in_executor(  # type: ignore
+                executor, fn, *args
+            )
 
     __all__.append("CurioSketchContext")
@@ -17,19 +17,71 @@
 
 from typing import Any, Callable, Dict
 import collections
-import html
 import json
+import re
 import urllib.parse
 
-__all__ = ["builtin_escape_fns"]
+__all__ = ["EscapedStr", "mark_as_escaped"]
+
+# Characters never quoted by urllib.parse.quote.
+_URL_SAFE_RE = re.compile(r"[A-Za-z0-9_.\-~]*")
+_URL_PATH_SAFE_RE = re.compile(r"[A-Za-z0-9_.\-~/]*")
+
+
+class EscapedStr(str):
+    """
+    A string that has already been escaped for HTML.
+
+    The :code:`default`, :code:`html` and :code:`h` escape functions output
+    it as is, without scanning it again. Other escape functions treat it as a
+    normal string.
+
+    Operations on the string (e.g.: concatenation) return a normal
+    :class:`str`, which will be escaped.
+    """
+
+    __slots__ = ()
+
+
+def mark_as_escaped(escaped_str: str) -> EscapedStr:
+    """
+    Mark a string as already escaped for HTML.
+
+    .. warning::
+
+        The string will be output without escaping. Only mark strings from
+        trusted sources.
+    """
+    if isinstance(escaped_str, EscapedStr):
+        return escaped_str
+
+    return EscapedStr(escaped_str)
 
 
 def _escape_html(unsafe_str: str) -> str:
+    # Type checks are assertions, so they are only run in debug mode.
     assert isinstance(unsafe_str, str), (
         f"The content({unsafe_str!r}) subject for html "
         f"escaping is not a string."
     )
-    return html.escape(unsafe_str)
+
+    if isinstance(unsafe_str, EscapedStr):
+        return unsafe_str
+
+    # Same as html.escape, but a character is only replaced if present,
+    # so strings without special characters are only scanned.
+    if "&" in unsafe_str:
+        unsafe_str = unsafe_str.replace("&", "&amp;")
+    if "<" in unsafe_str:
+        unsafe_str = unsafe_str.replace("<", "&lt;")
+    if ">" in unsafe_str:
+        unsafe_str = unsafe_str.replace(">", "&gt;")
+    if '"' in unsafe_str:
+        unsafe_str = unsafe_str.replace('"', "&quot;")
+    if "'" in unsafe_str:
+        unsafe_str = unsafe_str.replace("'", "&#x27;")
+
+    return unsafe_str
 
 
 def _no_escape(unsafe_str: str) -> str:
@@ -44,6 +96,10 @@ def _escape_url_with_plus(unsafe_str: str) -> str:
         f"The content({unsafe_str!r}) subject for url "
         f"escaping is not a string."
     )
+
+    if _URL_SAFE_RE.fullmatch(unsafe_str) is not None:
+        return unsafe_str
+
     return urllib.parse.quote_plus(unsafe_str)
 
 
@@ -52,6 +108,10 @@ def _escape_url_without_plus(unsafe_str: str) -> str:
         f"The content({unsafe_str!r}) subject for url "
         f"escaping is not a string."
     )
+
+    if _URL_PATH_SAFE_RE.fullmatch(unsafe_str) is not None:
+        return unsafe_str
+
     return urllib.parse.quote(unsafe_str)
 
 
@@ -18,6 +18,7 @@
 __all__ = [
     "SketchbookException",
     "SketchNotFoundError",
+    "SketchIntegrityError",
     "SketchSyntaxError",
     "UnknownStatementError",
     "BlockNameConflictError",
@@ -41,6 +42,14 @@ class SketchNotFoundError(FileNotFoundError, SketchbookException):
     pass
 
 
+class SketchIntegrityError(SketchbookException):
+    """
+    Error when a loaded sketch does not match the manifest of the finder.
+    """
+
+    pass
+
+
 class SketchSyntaxError(SyntaxError, SketchbookException):
     """
     Syntax error in the current sketch.
@@ -15,19 +15,220 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
-from typing import Dict, Optional, Union
+from types import ModuleType
+from typing import (
+    Any,
+    ContextManager,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
 import abc
 import asyncio
+import collections
 import concurrent.futures
 import contextlib
+import fnmatch
+import gc
+import marshal
+import mmap
+import operator
 import os
+import struct
+import sys
+import threading
+import time
+import warnings
+import zipfile
+import zlib
 
-from . import context, exceptions, sketch
+from . import _inotify, context, exceptions, manifest, sketch
 
 with contextlib.suppress(ImportError):
     import curio
 
-__all__ = ["BaseSketchFinder", "SyncSketchFinder"]
+__all__ = [
+    "SketchCacheInfo",
+    "SketchPreloadReport",
+    "BaseSketchFinder",
+    "SyncSketchFinder",
+    "AsyncSketchFinder",
+    "ZipSketchFinder",
+    "DictSketchFinder",
+    "LayeredSketchFinder",
+    "SwappableSketchFinder",
+]
+
+# The root of finders which do not load sketches from the file system.
+_VIRTUAL_ROOT = "/<virtual>/"
+
+# The fixed part of the local file header of zip archives.
+_ZIP_LOCAL_HEADER = struct.Struct("<4s22xHH")
+_ZIP_LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+
+
+class SketchCacheInfo(NamedTuple):
+    """
+    Statistics of the sketch cache, returned by
+    :meth:`.BaseSketchFinder.cache_info`.
+    """
+
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    nbytes: int
+    max_size: Optional[int]
+    max_nbytes: Optional[int]
+
+
+class SketchPreloadReport(NamedTuple):
+    """
+    The result of :meth:`.BaseSketchFinder.preload`.
+
+    :code:`loaded` contains the seconds spent on each loaded sketch,
+    :code:`failed` contains the exception raised by each failed sketch, and
+    :code:`elapsed` is the seconds spent on the whole preload.
+    """
+
+    loaded: Dict[str, float]
+    failed: Dict[str, Exception]
+    elapsed: float
+
+
+def _resolve_path(
+    root_path: str, skt_path: str, origin_path: Optional[str] = None
+) -> str:
+    """
+    Resolve the absolute path of :code:`skt_path` under :code:`root_path`,
+    which must end with :code:`/`.
+
+    :code:`skt_path` starting with :code:`/` is relative to
+    :code:`root_path`, otherwise it is relative to the directory of
+    :code:`origin_path` (if applicable).
+    """
+    skt_path = skt_path.replace("\\", "/")
+    # Replace Windows Style Path to UNIX Style.
+
+    if origin_path is not None and (not os.path.isabs(skt_path)):
+        origin_dir = os.path.join(root_path, os.path.dirname(origin_path))
+
+    else:
+        origin_dir = root_path
+
+    if os.path.isabs(skt_path):
+        _, skt_path = skt_path.split("/", 1)
+        # Take out the root identifier.
+
+    final_skt_path = os.path.abspath(os.path.join(origin_dir, skt_path))
+
+    if not final_skt_path.startswith(root_path):
+        raise exceptions.SketchNotFoundError(
+            "To prevent potential directory traversal attack, "
+            "this path is not acceptable."
+        )
+
+    return final_skt_path
+
+
+def _resolve_virtual_path(
+    skt_path: str, origin_path: Optional[str] = None
+) -> str:
+    """
+    Resolve the path of :code:`skt_path` with the same rules as
+    :func:`_resolve_path`, for finders whose sketches have paths starting
+    with :code:`/` but are not on the file system.
+    """
+    if origin_path is not None:
+        origin_path = _VIRTUAL_ROOT + origin_path.lstrip("/")
+
+    final_skt_path = _resolve_path(
+        _VIRTUAL_ROOT, skt_path, origin_path=origin_path
+    )
+
+    return "/" + final_skt_path[len(_VIRTUAL_ROOT) :]
+
+
+def _get_file_stamp(abs_skt_path: str) -> Tuple[int, int]:
+    try:
+        stat_result = os.stat(abs_skt_path)
+
+    except FileNotFoundError as e:
+        raise exceptions.SketchNotFoundError(
+            f"No such file {abs_skt_path}."
+        ) from e
+
+    return (stat_result.st_mtime_ns, stat_result.st_size)
+
+
+def _read_file(abs_skt_path: str) -> bytes:
+    try:
+        with open(abs_skt_path, mode="rb") as skt_fp:
+            return skt_fp.read()
+
+    except FileNotFoundError as e:
+        raise exceptions.SketchNotFoundError(
+            f"No such file {abs_skt_path}."
+        ) from e
+
+
+def _read_verified_file(
+    root_path: str, skt_manifest: manifest.SketchManifest, abs_skt_path: str
+) -> bytes:
+    skt_content = _read_file(abs_skt_path)
+    skt_manifest.verify("/" + abs_skt_path[len(root_path) :], skt_content)
+
+    return skt_content
+
+
+def _find_layer_file(
+    root_paths: Sequence[str], skt_path: str
+) -> Optional[str]:
+    for root_path in root_paths:
+        layer_skt_path = root_path + skt_path[1:]
+
+        if os.path.isfile(layer_skt_path):
+            return layer_skt_path
+
+    return None
+
+
+def _walk_root(root_path: str) -> List[str]:
+    skt_paths: List[str] = []
+
+    for dir_path, _, file_names in os.walk(root_path):
+        for file_name in file_names:
+            skt_paths.append(
+                "/"
+                + os.path.relpath(os.path.join(dir_path, file_name), root_path)
+            )
+
+    return sorted(skt_paths)
+
+
+def _create_watcher(
+    skt_ctx: "context.BaseSketchContext", use_inotify: bool
+) -> Optional[_inotify.InotifyWatcher]:
+    if not use_inotify or not skt_ctx.auto_reload:
+        return None
+
+    if not _inotify.is_available():
+        warnings.warn(
+            "inotify is not available on this platform, "
+            "sketches will be checked by their modification time.",
+            RuntimeWarning,
+        )
+
+        return None
+
+    return _inotify.InotifyWatcher()
 
 
 class BaseSketchFinder(abc.ABC):
@@ -46,13 +247,47 @@ class BaseSketchFinder(abc.ABC):
         self, *, skt_ctx: Optional["context.BaseSketchContext"] = None
     ) -> None:
         self._ctx = skt_ctx or context.AsyncioSketchContext()
-        self._skt_cache: Dict[str, sketch.Sketch] = {}
+        # Sketches by their absolute path, from the least recently used.
+        self._skt_cache: "collections.OrderedDict[str, sketch.Sketch]" = (
+            collections.OrderedDict()
+        )
+        self._skt_sizes: Dict[str, int] = {}
+        self._skt_cache_nbytes = 0
+
+        self._cache_hits = 0
+        self._cache_misses = 0
+        self._cache_evictions = 0
+
+        # Absolute paths by the requested path and the origin directory.
+        self._abs_path_cache: Dict[Tuple[str, Optional[str]], str] = {}
+        self._abs_path_keys: Dict[str, Set[Tuple[str, Optional[str]]]] = {}
+
+        # Stamps of the cached sketches and when they were last checked.
+        self._skt_stamps: Dict[str, Any] = {}
+        self._skt_checked_at: Dict[str, float] = {}
+
+        # Set by finders which can watch for changes.
+        self._watcher: Optional[_inotify.InotifyWatcher] = None
+        self._watcher_polled_at = float("-inf")
+
+        # Locks of the sketches being loaded, by their absolute path. They
+        # belong to an event loop, so each thread has its own locks if the
+        # finder is shared by threads.
+        self._find_skt_locks: Dict[str, Any] = {}
+        self._thread_local = threading.local()
+
+        # Guards the caches above if the finder is shared by threads.
+        self._cache_lock: ContextManager[Any] = (
+            threading.RLock()
+            if self._ctx.thread_safe
+            else contextlib.nullcontext()
+        )
 
         if isinstance(self._ctx, context.AsyncioSketchContext):
-            self._find_skt_lock = asyncio.Lock()
+            self._lock_cls: Any = asyncio.Lock
 
         elif isinstance(self._ctx, context.CurioSketchContext):  # noqa: SIM106
-            self._find_skt_lock = curio.Lock()
+            self._lock_cls = curio.Lock
 
         else:
             raise RuntimeError("Unknown sketch context.")
@@ -60,13 +295,13 @@ class BaseSketchFinder(abc.ABC):
     @abc.abstractmethod
     async def _load_sketch_content(
         self, skt_path: str
-    ) -> Union[str, bytes]:  # pragma: no cover
+    ) -> Union[str, bytes, memoryview]:  # pragma: no cover
         """
         This is an :func:`abc.abstractmethod`.
 
         Override this method to customize sketch loading.
 
-        Load the sketch content as string or bytestring.
+        Load the sketch content as string, bytestring or :class:`memoryview`.
 
         .. important::
 
@@ -87,6 +322,10 @@ class BaseSketchFinder(abc.ABC):
         Solve the absolute path(starting with :code:`/`) of the sketch from
         :code:`skt_path` based on the :code:`origin_path` (if applicable).
 
+        The result is cached by :code:`skt_path` and the directory of
+        :code:`origin_path`, which is the absolute path of the sketch
+        including or inheriting :code:`skt_path`.
+
         .. important::
 
             If no matched file is found, it should raise a
@@ -94,29 +333,497 @@ class BaseSketchFinder(abc.ABC):
         """
         raise NotImplementedError
 
+    async def _list_sketch_paths(self) -> List[str]:  # pragma: no cover
+        """
+        Override this method to support :meth:`preload`.
+
+        List the paths of all sketches, starting with :code:`/`.
+        """
+        raise NotImplementedError
+
+    async def _get_sketch_stamp(self, abs_skt_path: str) -> Any:
+        """
+        Override this method to support :code:`auto_reload`.
+
+        Return a value which changes when the sketch changes, such as the
+        modification time. Sketches with a stamp of :code:`None` are never
+        reloaded.
+        """
+        return None
+
+    async def _is_sketch_changed(self, abs_skt_path: str) -> bool:
+        if self._watcher is not None and self._watcher.is_watched(
+            os.path.dirname(abs_skt_path)
+        ):
+            # The watcher uncaches changed sketches in _poll_watcher.
+            return False
+
+        checked_at = time.monotonic()
+
+        with self._cache_lock:
+            last_checked_at = self._skt_checked_at.get(abs_skt_path)
+
+            if (
+                last_checked_at is None
+                or checked_at - last_checked_at
+                < self._ctx.auto_reload_interval
+            ):
+                return False
+
+            # Concurrent hits do not check the same sketch again.
+            self._skt_checked_at[abs_skt_path] = checked_at
+
+            stamp: object = self._skt_stamps[abs_skt_path]
+
+        if stamp is None:
+            return False
+
+        try:
+            current_stamp: object = await self._get_sketch_stamp(abs_skt_path)
+
+        except exceptions.SketchNotFoundError:
+            return True
+
+        return current_stamp != stamp
+
+    def _watch_sketch_dir(self, abs_skt_path: str) -> None:
+        assert self._watcher is not None
+
+        try:
+            self._watcher.watch_dir(os.path.dirname(abs_skt_path))
+
+        except OSError as e:
+            # Such as the limit of inotify watches is reached.
+            warnings.warn(
+                f"Failed to watch the directory of {abs_skt_path} ({e}), "
+                "the sketch will be checked by its modification time.",
+                RuntimeWarning,
+            )
+
+    def _poll_watcher(self) -> None:
+        assert self._watcher is not None
+
+        # Events are read at most once per interval, so most finds do not
+        # make a system call.
+        polled_at = time.monotonic()
+
+        if (
+            polled_at - self._watcher_polled_at
+            < self._ctx.auto_reload_interval
+        ):
+            return
+
+        with self._cache_lock:
+            self._watcher_polled_at = polled_at
+
+            changed_paths = self._watcher.read_changed_paths()
+
+            if changed_paths is None:
+                changed_paths = set(self._skt_cache.keys())
+
+            for changed_path in changed_paths:
+                if changed_path in self._skt_cache:
+                    self._uncache_sketch(changed_path)
+
+    def _get_cached_sketch(
+        self, abs_skt_path: str
+    ) -> Optional["sketch.Sketch"]:
+        with self._cache_lock:
+            skt = self._skt_cache.get(abs_skt_path)
+
+            if skt is not None:
+                self._skt_cache.move_to_end(abs_skt_path)
+                self._cache_hits += 1
+
+            return skt
+
+    def _cache_sketch(self, abs_skt_path: str, skt: "sketch.Sketch") -> None:
+        max_size = self._ctx.max_cached_sketches
+        max_nbytes = self._ctx.max_cached_bytes
+
+        skt_size = skt._estimate_size() if max_nbytes is not None else 0
+
+        with self._cache_lock:
+            self._skt_cache[abs_skt_path] = skt
+            self._skt_sizes[abs_skt_path] = skt_size
+            self._skt_cache_nbytes += skt_size
+
+            while self._skt_cache and (
+                (max_size is not None and len(self._skt_cache) > max_size)
+                or (
+                    max_nbytes is not None
+                    and self._skt_cache_nbytes > max_nbytes
+                )
+            ):
+                self._uncache_sketch(next(iter(self._skt_cache)))
+                self._cache_evictions += 1
+
+    def _uncache_sketch(self, abs_skt_path: str) -> None:
+        with self._cache_lock:
+            del self._skt_cache[abs_skt_path]
+            self._skt_cache_nbytes -= self._skt_sizes.pop(abs_skt_path)
+
+            self._skt_stamps.pop(abs_skt_path, None)
+            self._skt_checked_at.pop(abs_skt_path, None)
+
+            for abs_path_key in self._abs_path_keys.pop(abs_skt_path, ()):
+                del self._abs_path_cache[abs_path_key]
+
+    def cache_info(self) -> SketchCacheInfo:
+        """
+        Return the statistics of the sketch cache as a
+        :class:`.SketchCacheInfo`.
+
+        :code:`nbytes` is only counted when :code:`max_cached_bytes` is set
+        on the context.
+        """
+        with self._cache_lock:
+            return SketchCacheInfo(
+                hits=self._cache_hits,
+                misses=self._cache_misses,
+                evictions=self._cache_evictions,
+                size=len(self._skt_cache),
+                nbytes=self._skt_cache_nbytes,
+                max_size=self._ctx.max_cached_sketches,
+                max_nbytes=self._ctx.max_cached_bytes,
+            )
+
+    async def _load_sketch(
+        self,
+        abs_skt_path: str,
+        executor: Optional[concurrent.futures.Executor] = None,
+    ) -> "sketch.Sketch":
+        skt_content = await self._load_sketch_content(abs_skt_path)
+
+        executor = executor or self._ctx.compile_executor
+
+        if executor is None:
+            return sketch.Sketch(
+                skt_content, path=abs_skt_path, skt_ctx=self._ctx, finder=self
+            )
+
+        skt = sketch.Sketch._create_unparsed(
+            skt_content, path=abs_skt_path, skt_ctx=self._ctx, finder=self
+        )
+
+        if hasattr(skt, "_printed_skt"):  # Loaded from the bytecode cache.
+            return skt
+
+        if not isinstance(executor, concurrent.futures.ProcessPoolExecutor):
+            # Threads share the context, so the sketch is compiled in place.
+            await self._ctx._run_in_executor(
+                executor, operator.attrgetter("_compiled_code"), skt
+            )
+
+        else:
+            marshalled_code = await self._ctx._run_in_executor(
+                executor,
+                sketch._compile_sketch,
+                skt._content,
+                abs_skt_path,
+                list(self._ctx.escape_fns.keys()),
+                self._ctx.source_encoding,
+            )
+            skt._set_compiled_code(marshal.loads(marshalled_code))
+
+        return skt
+
+    async def _load_cached_sketch(
+        self,
+        abs_skt_path: str,
+        executor: Optional[concurrent.futures.Executor] = None,
+        prefetched_paths: Optional[Set[str]] = None,
+    ) -> "sketch.Sketch":
+        # Concurrent finds of the same sketch share one load, while different
+        # sketches are loaded in parallel.
+        if self._ctx.thread_safe:
+            find_skt_locks = self._thread_local.__dict__.setdefault(
+                "find_skt_locks", {}
+            )
+
+        else:
+            find_skt_locks = self._find_skt_locks
+
+        find_skt_lock = find_skt_locks.get(abs_skt_path)
+
+        if find_skt_lock is None:
+            find_skt_lock = self._lock_cls()
+            find_skt_locks[abs_skt_path] = find_skt_lock
+
+        async with find_skt_lock:
+            # Loaded while waiting for the lock.
+            maybe_skt = self._get_cached_sketch(abs_skt_path)
+
+            if maybe_skt is not None:
+                return maybe_skt
+
+            try:
+                with self._cache_lock:
+                    self._cache_misses += 1
+
+                if self._ctx.auto_reload:
+                    # Take the stamp first, so changes during the loading
+                    # are found by the next check.
+                    stamp = await self._get_sketch_stamp(abs_skt_path)
+
+                skt = await self._load_sketch(abs_skt_path, executor)
+
+                with self._cache_lock:
+                    maybe_skt = self._skt_cache.get(abs_skt_path)
+
+                    if maybe_skt is not None:
+                        # Loaded by another thread at the same time, only
+                        # one of them is kept.
+                        skt = maybe_skt
+
+                    else:
+                        if self._ctx.auto_reload:
+                            self._skt_stamps[abs_skt_path] = stamp
+                            self._skt_checked_at[
+                                abs_skt_path
+                            ] = time.monotonic()
+
+                            if self._watcher is not None:
+                                self._watch_sketch_dir(abs_skt_path)
+
+                        self._cache_sketch(abs_skt_path, skt)
+
+            finally:
+                if find_skt_locks.get(abs_skt_path) is find_skt_lock:
+                    del find_skt_locks[abs_skt_path]
+
+        if prefetched_paths is None:
+            prefetched_paths = set()
+
+        # Each sketch is prefetched once per find, so cyclic dependencies and
+        # sketches evicted by their dependencies are not loaded again.
+        if abs_skt_path not in prefetched_paths:
+            prefetched_paths.add(abs_skt_path)
+
+            await self._prefetch_deps(skt, prefetched_paths)
+
+        return skt
+
+    async def _prefetch_deps(
+        self, skt: "sketch.Sketch", prefetched_paths: Set[str]
+    ) -> None:
+        """
+        Load the sketches included or inherited by string literals
+        concurrently, instead of one at a time when drawing.
+
+        All the statically known dependencies are loaded, so sketches only
+        included in branches which are never taken are loaded as well, at the
+        cost of loading and compiling them once.
+
+        Errors are raised again when drawing, so they are ignored here.
+        """
+        try:
+            static_deps = skt._static_deps
+
+        except Exception:
+            return
+
+        async def prefetch_dep(dep_path: str) -> None:
+            with contextlib.suppress(Exception):
+                await self._find(
+                    dep_path,
+                    origin_path=skt._path,
+                    prefetched_paths=prefetched_paths,
+                )
+
+        await self._ctx._gather(prefetch_dep(p) for p in static_deps)
+
     async def _find(
-        self, skt_path: str, origin_path: Optional[str] = None
+        self,
+        skt_path: str,
+        origin_path: Optional[str] = None,
+        prefetched_paths: Optional[Set[str]] = None,
     ) -> "sketch.Sketch":
-        async with self._find_skt_lock:  # Find one sketch at a time.
-            if skt_path in self._skt_cache:
-                # Try to read from the cache.
-                return self._skt_cache[skt_path]
+        if not self._ctx.cache_sketches:
+            abs_skt_path = await self._find_abs_path(
+                skt_path, origin_path=origin_path
+            )
+
+            return await self._load_sketch(abs_skt_path)
+
+        if self._watcher is not None and self._ctx.auto_reload:
+            self._poll_watcher()
+
+        abs_path_key = (
+            skt_path,
+            None if origin_path is None else os.path.dirname(origin_path),
+        )
+        maybe_abs_skt_path = self._abs_path_cache.get(abs_path_key)
 
+        if maybe_abs_skt_path is None:
             # Resolve the path.
             abs_skt_path = await self._find_abs_path(
                 skt_path, origin_path=origin_path
             )
 
-            skt_content = await self._load_sketch_content(abs_skt_path)
-
-            skt = sketch.Sketch(
-                skt_content, path=skt_path, skt_ctx=self._ctx, finder=self
+        else:
+            abs_skt_path = maybe_abs_skt_path
+
+        # Cache hits do not wait for sketches being loaded.
+        maybe_skt = self._get_cached_sketch(abs_skt_path)
+
+        if (
+            maybe_skt is not None
+            and self._ctx.auto_reload
+            and abs_skt_path in self._skt_checked_at
+            and await self._is_sketch_changed(abs_skt_path)
+        ):
+            with self._cache_lock:
+                if self._skt_cache.get(abs_skt_path) is maybe_skt:
+                    self._uncache_sketch(abs_skt_path)
+
+            maybe_skt = None
+
+        if maybe_skt is None:
+            skt = await self._load_cached_sketch(
+                abs_skt_path, prefetched_paths=prefetched_paths
             )
 
-            if self._ctx.cache_sketches:
-                self._skt_cache[skt_path] = skt
+        else:
+            skt = maybe_skt
+
+        # Paths are only memoized for sketches in the cache, so they are
+        # resolved again once the sketch is evicted.
+        with self._cache_lock:
+            if (
+                abs_path_key not in self._abs_path_cache
+                and abs_skt_path in self._skt_cache
+            ):
+                self._abs_path_cache[abs_path_key] = abs_skt_path
+                self._abs_path_keys.setdefault(abs_skt_path, set()).add(
+                    abs_path_key
+                )
 
-            return skt
+        return skt
+
+    async def preload(
+        self,
+        patterns: Union[str, Iterable[str]] = "*",
+        *,
+        executor: Optional[concurrent.futures.Executor] = None,
+    ) -> SketchPreloadReport:
+        """
+        Load and compile the sketches matching any of the :code:`patterns`
+        concurrently, so they are cached before the first draw.
+
+        Patterns are matched by :func:`fnmatch.fnmatchcase` against the
+        paths starting with :code:`/`, such as :code:`/pages/*.html`.
+
+        All the files matching the patterns are loaded as sketches, so use
+        patterns such as :code:`*.html` if other files are stored with the
+        sketches. Failures, including files which are not sketches, do not
+        stop other sketches from being loaded, and are returned in the
+        :class:`.SketchPreloadReport`.
+
+        :arg executor: If set, sketches are parsed and compiled in this
+            executor instead of the event loop. A
+            :class:`concurrent.futures.ProcessPoolExecutor` compiles sketches
+            in parallel, with the built-in statements.
+            Default: :code:`None` (Use the :code:`compile_executor` of the
+            context).
+        """
+        if isinstance(patterns, str):
+            patterns = [patterns]
+
+        else:
+            patterns = list(patterns)
+
+        started_at = time.perf_counter()
+
+        skt_paths = [
+            skt_path
+            for skt_path in await self._list_sketch_paths()
+            if any(fnmatch.fnmatchcase(skt_path, p) for p in patterns)
+        ]
+
+        loaded: Dict[str, float] = {}
+        failed: Dict[str, Exception] = {}
+
+        async def preload_sketch(skt_path: str) -> None:
+            skt_started_at = time.perf_counter()
+
+            try:
+                abs_skt_path = await self._find_abs_path(skt_path)
+
+                if self._ctx.cache_sketches:
+                    skt = await self._load_cached_sketch(
+                        abs_skt_path, executor
+                    )
+
+                else:
+                    skt = await self._load_sketch(abs_skt_path, executor)
+
+                try:
+                    skt._compiled_code  # Compile the sketch.
+
+                except Exception:
+                    # Not kept in the cache, so the error is raised again
+                    # when the sketch is found.
+                    with self._cache_lock:
+                        if self._skt_cache.get(abs_skt_path) is skt:
+                            self._uncache_sketch(abs_skt_path)
+
+                    raise
+
+            except Exception as e:
+                failed[skt_path] = e
+
+            else:
+                loaded[skt_path] = time.perf_counter() - skt_started_at
+
+        await self._ctx._gather(
+            preload_sketch(skt_path) for skt_path in skt_paths
+        )
+
+        return SketchPreloadReport(
+            loaded=loaded,
+            failed=failed,
+            elapsed=time.perf_counter() - started_at,
+        )
+
+    def freeze(self) -> None:
+        """
+        Finalize the cached sketches for forking worker processes, after
+        they are loaded (see :meth:`preload`).
+
+        Each cached sketch is compiled, and its source and parse tree are
+        dropped. Sketches failing to compile are removed from the cache, so
+        the errors are raised when they are found again. Then all the
+        objects are moved to the permanent generation
+        of the garbage collector with :func:`gc.freeze`, so collections in
+        the workers do not write to the pages shared with the parent.
+
+        .. important::
+
+            Drawing a sketch still changes the reference counts of its
+            functions and code objects, so the pages holding them are copied
+            by the workers drawing it.
+        """
+        with self._cache_lock:
+            for abs_skt_path, skt in list(self._skt_cache.items()):
+                try:
+                    skt._freeze()
+
+                except Exception:
+                    # Sketches failed to compile are loaded again when found,
+                    # so the errors are raised there.
+                    self._uncache_sketch(abs_skt_path)
+
+                    continue
+
+                if self._ctx.max_cached_bytes is not None:
+                    skt_size = skt._estimate_size()
+                    self._skt_cache_nbytes += (
+                        skt_size - self._skt_sizes[abs_skt_path]
+                    )
+                    self._skt_sizes[abs_skt_path] = skt_size
+
+        gc.freeze()
 
     async def find(self, skt_path: str) -> "sketch.Sketch":
         """
@@ -143,6 +850,13 @@ class SyncSketchFinder(BaseSketchFinder):
         :class:`.SyncSketchFinder` and :class:`.Sketch`.
         Default: :code:`None` (Create a new :class:`.AsyncioSketchContext`
         upon initialization).
+    :arg use_inotify: If :code:`True` and :code:`auto_reload` is enabled,
+        watch for changes with inotify instead of checking the modification
+        time of sketches. Only available on Linux. Default: :code:`False`.
+    :arg manifest_path: If set, the manifest of the root path is loaded from
+        this file (see :class:`.SketchManifest`). Sketches are then looked up
+        in the manifest instead of the file system, and verified against the
+        manifest when loaded. Default: :code:`None`.
     """
 
     def __init__(
@@ -151,6 +865,8 @@ class SyncSketchFinder(BaseSketchFinder):
         *,
         executor: Optional[concurrent.futures.ThreadPoolExecutor] = None,
         skt_ctx: Optional["context.BaseSketchContext"] = None,
+        use_inotify: bool = False,
+        manifest_path: Optional[str] = None,
     ) -> None:
         assert isinstance(__root_path, str)
 
@@ -160,146 +876,716 @@ class SyncSketchFinder(BaseSketchFinder):
         if not self._root_path.endswith("/"):
             self._root_path += "/"
 
+        self._watcher = _create_watcher(self._ctx, use_inotify)
+
+        self._manifest = (
+            manifest.SketchManifest.load(manifest_path)
+            if manifest_path is not None
+            else None
+        )
+
     async def _find_abs_path(
         self, skt_path: str, origin_path: Optional[str] = None
     ) -> str:
-        skt_path = skt_path.replace("\\", "/")
-        # Replace Windows Style Path to UNIX Style.
+        final_skt_path = _resolve_path(
+            self._root_path, skt_path, origin_path=origin_path
+        )
 
-        if origin_path is not None and (not os.path.isabs(skt_path)):
-            origin_dir = os.path.join(
-                self._root_path, os.path.dirname(origin_path)
+        if self._manifest is not None:
+            skt_exists = (
+                "/" + final_skt_path[len(self._root_path) :] in self._manifest
             )
 
         else:
-            origin_dir = self._root_path
+            skt_exists = os.path.exists(final_skt_path)
+
+        if not skt_exists:
+            raise exceptions.SketchNotFoundError(
+                f"No such file {final_skt_path}."
+            )
 
-        if os.path.isabs(skt_path):
-            _, skt_path = skt_path.split("/", 1)
-            # Take out the root identifier.
+        return final_skt_path
 
-        final_skt_path = os.path.abspath(os.path.join(origin_dir, skt_path))
-        final_skt_dir = os.path.dirname(final_skt_path)
+    async def _list_sketch_paths(self) -> List[str]:
+        if self._manifest is not None:
+            return sorted(self._manifest.entries)
 
-        if not final_skt_dir.endswith("/"):
-            final_skt_dir += "/"
+        return _walk_root(self._root_path)
 
-        if not final_skt_path.startswith(self._root_path):
-            raise exceptions.SketchNotFoundError(
-                "To prevent potential directory traversal attack, "
-                "this path is not acceptable."
+    async def _get_sketch_stamp(self, abs_skt_path: str) -> Tuple[int, int]:
+        return _get_file_stamp(abs_skt_path)
+
+    async def _load_sketch_content(self, skt_path: str) -> bytes:
+        if self._manifest is not None:
+            return _read_verified_file(
+                self._root_path, self._manifest, skt_path
+            )
+
+        return _read_file(skt_path)
+
+
+class AsyncSketchFinder(BaseSketchFinder):
+    """
+    An implementation of :class:`.BaseSketchFinder` loading sketches from
+    the local file system in an executor.
+
+    Paths are resolved without touching the file system, and each sketch is
+    checked and read in one job of the executor, so no file system operation
+    blocks the event loop.
+
+    .. important::
+
+        This finder must be used with an asyncio event loop.
+
+    :arg __root_path: The root path of the finder. Use :code:`/` in
+        inclusion and inheritance to indicate the root path. This argument
+        must be passed positionally and must be the first argument.
+    :arg executor: The executor used to load files.
+        Default: :code:`None` (Create a new executor upon initialization).
+    :arg skt_ctx: The :class:`.AsyncioSketchContext` to be used by the
+        :class:`.AsyncSketchFinder` and :class:`.Sketch`.
+        Default: :code:`None` (Create a new :class:`.AsyncioSketchContext`
+        upon initialization).
+    :arg use_inotify: If :code:`True` and :code:`auto_reload` is enabled,
+        watch for changes with inotify instead of checking the modification
+        time of sketches. Only available on Linux. Default: :code:`False`.
+    :arg manifest_path: If set, the manifest of the root path is loaded from
+        this file (see :class:`.SketchManifest`). Sketches missing from the
+        manifest are rejected without a job in the executor, and sketches are
+        verified against the manifest when loaded. Default: :code:`None`.
+
+    """
+
+    def __init__(
+        self,
+        __root_path: str,
+        *,
+        executor: Optional[concurrent.futures.ThreadPoolExecutor] = None,
+        skt_ctx: Optional["context.AsyncioSketchContext"] = None,
+        use_inotify: bool = False,
+        manifest_path: Optional[str] = None,
+    ) -> None:
+        assert isinstance(__root_path, str)
+
+        super().__init__(skt_ctx=skt_ctx)
+
+        if not isinstance(self._ctx, context.AsyncioSketchContext):
+            raise RuntimeError(
+                "AsyncSketchFinder can only be used with "
+                "AsyncioSketchContext."
             )
 
-        if not os.path.exists(final_skt_path):
+        self._root_path = os.path.abspath(__root_path)
+        if not self._root_path.endswith("/"):
+            self._root_path += "/"
+
+        self._executor = executor or concurrent.futures.ThreadPoolExecutor()
+
+        self._watcher = _create_watcher(self._ctx, use_inotify)
+
+        self._manifest = (
+            manifest.SketchManifest.load(manifest_path)
+            if manifest_path is not None
+            else None
+        )
+
+    async def _find_abs_path(
+        self, skt_path: str, origin_path: Optional[str] = None
+    ) -> str:
+        # The existence is checked when the sketch is read, so resolving
+        # paths does not touch the file system.
+        final_skt_path = _resolve_path(
+            self._root_path, skt_path, origin_path=origin_path
+        )
+
+        if (
+            self._manifest is not None
+            and "/" + final_skt_path[len(self._root_path) :]
+            not in self._manifest
+        ):
             raise exceptions.SketchNotFoundError(
                 f"No such file {final_skt_path}."
             )
 
         return final_skt_path
 
+    async def _list_sketch_paths(self) -> List[str]:
+        if self._manifest is not None:
+            return sorted(self._manifest.entries)
+
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, _walk_root, self._root_path
+        )
+
+    async def _get_sketch_stamp(self, abs_skt_path: str) -> Tuple[int, int]:
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, _get_file_stamp, abs_skt_path
+        )
+
     async def _load_sketch_content(self, skt_path: str) -> bytes:
-        with open(skt_path, mode="rb") as skt_fp:
-            return skt_fp.read()
+        if self._manifest is not None:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor,
+                _read_verified_file,
+                self._root_path,
+                self._manifest,
+                skt_path,
+            )
+
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, _read_file, skt_path
+        )
+
+
+class ZipSketchFinder(BaseSketchFinder):
+    """
+    An implementation of :class:`.BaseSketchFinder` loading sketches from a
+    zip archive, which should not change while the finder is used.
+
+    The archive is memory-mapped and its members are indexed upon
+    initialization. Members stored without compression are loaded as
+    slices of the memory map with no copy.
+
+    :arg __archive_path: The path of the zip archive. Use :code:`/` in
+        inclusion and inheritance to indicate the root of the archive. This
+        argument must be passed positionally and must be the first argument.
+    :arg prefix: The directory in the archive used as the root.
+        Default: :code:`""` (The root of the archive).
+    :arg skt_ctx: The :class:`.BaseSketchContext` to be used by the
+        :class:`.ZipSketchFinder` and :class:`.Sketch`.
+        Default: :code:`None` (Create a new :class:`.AsyncioSketchContext`
+        upon initialization).
+    """
+
+    def __init__(
+        self,
+        __archive_path: str,
+        *,
+        prefix: str = "",
+        skt_ctx: Optional["context.BaseSketchContext"] = None,
+    ) -> None:
+        assert isinstance(__archive_path, str)
+
+        super().__init__(skt_ctx=skt_ctx)
+
+        self._archive_path = os.path.abspath(__archive_path)
+
+        with open(self._archive_path, "rb") as archive_fp:
+            self._archive_mmap = mmap.mmap(
+                archive_fp.fileno(), 0, access=mmap.ACCESS_READ
+            )
+
+        prefix = prefix.strip("/")
+        if prefix:
+            prefix += "/"
+
+        self._members: Dict[str, zipfile.ZipInfo] = {}
+
+        with zipfile.ZipFile(self._archive_path) as archive:
+            for info in archive.infolist():
+                if info.is_dir() or not info.filename.startswith(prefix):
+                    continue
+
+                self._members["/" + info.filename[len(prefix) :]] = info
+
+    async def _list_sketch_paths(self) -> List[str]:
+        return sorted(self._members.keys())
+
+    async def _find_abs_path(
+        self, skt_path: str, origin_path: Optional[str] = None
+    ) -> str:
+        final_skt_path = _resolve_virtual_path(
+            skt_path, origin_path=origin_path
+        )
+
+        if final_skt_path not in self._members:
+            raise exceptions.SketchNotFoundError(
+                f"No such member {final_skt_path} "
+                f"in archive {self._archive_path}."
+            )
+
+        return final_skt_path
+
+    def close(self) -> None:
+        """
+        Close the memory map of the archive. The sketches found before are
+        not affected, but no more sketches can be loaded.
+
+        .. important::
+
+            Call this method after the sketches of the finder are no longer
+            used, such as the previous generation of a
+            :class:`.SwappableSketchFinder` after all draws with it finish.
+        """
+        self._archive_mmap.close()
+
+    async def _load_sketch_content(
+        self, skt_path: str
+    ) -> Union[bytes, memoryview]:
+        if self._archive_mmap.closed:
+            raise RuntimeError(f"Archive {self._archive_path} is closed.")
+
+        try:
+            info = self._members[skt_path]
+
+        except KeyError as e:
+            raise exceptions.SketchNotFoundError(
+                f"No such member {skt_path} in archive {self._archive_path}."
+            ) from e
+
+        if info.flag_bits & 0x1 or info.compress_type not in (
+            zipfile.ZIP_STORED,
+            zipfile.ZIP_DEFLATED,
+        ):
+            # Encrypted or compressed by other methods.
+            with zipfile.ZipFile(self._archive_path) as archive:
+                return archive.read(info)
+
+        signature, name_len, extra_len = _ZIP_LOCAL_HEADER.unpack_from(
+            self._archive_mmap, info.header_offset
+        )
+
+        if signature != _ZIP_LOCAL_HEADER_SIGNATURE:
+            raise zipfile.BadZipFile(
+                f"Bad local header of member {skt_path} "
+                f"in archive {self._archive_path}."
+            )
+
+        data_start = (
+            info.header_offset + _ZIP_LOCAL_HEADER.size + name_len + extra_len
+        )
+        data = memoryview(self._archive_mmap)[
+            data_start : data_start + info.compress_size
+        ]
+
+        if info.compress_type == zipfile.ZIP_STORED:
+            return data
+
+        return zlib.decompress(data, -zlib.MAX_WBITS)
+
+
+class LayeredSketchFinder(BaseSketchFinder):
+    """
+    An implementation of :class:`.BaseSketchFinder` loading sketches from
+    multiple root paths, where the sketches in the former root paths
+    override the ones with the same path in the latter root paths.
+
+    Sketches have the same paths in all the root paths, so the sketches
+    included or inherited are also looked up in all the root paths.
+
+    The root path of each sketch is remembered after it is found, and
+    sketches not found in any root path are not looked up again until
+    :code:`miss_ttl` passes. With :code:`auto_reload`, sketches are looked up
+    again when they are checked, so new overrides are picked up.
+
+    :arg __root_paths: The root paths of the finder, from the highest
+        priority. This argument must be passed positionally and must be the
+        first argument.
+    :arg miss_ttl: The seconds to remember that a sketch is not found.
+        Default: :code:`1.0`.
+    :arg executor: The executor used to look up and load files.
+        Default: :code:`None` (Use the default executor of the asynchronous
+        library).
+    :arg skt_ctx: The :class:`.BaseSketchContext` to be used by the
+        :class:`.LayeredSketchFinder` and :class:`.Sketch`.
+        Default: :code:`None` (Create a new :class:`.AsyncioSketchContext`
+        upon initialization).
+    """
+
+    def __init__(
+        self,
+        __root_paths: Sequence[str],
+        *,
+        miss_ttl: float = 1.0,
+        executor: Optional[concurrent.futures.Executor] = None,
+        skt_ctx: Optional["context.BaseSketchContext"] = None,
+    ) -> None:
+        assert not isinstance(__root_paths, str)
+
+        super().__init__(skt_ctx=skt_ctx)
+
+        self._root_paths: List[str] = []
+
+        for root_path in __root_paths:
+            root_path = os.path.abspath(root_path)
+            if not root_path.endswith("/"):
+                root_path += "/"
+
+            self._root_paths.append(root_path)
+
+        self._miss_ttl = miss_ttl
+
+        self._executor = executor
+
+        # File system paths by the paths of sketches.
+        self._layer_paths: Dict[str, str] = {}
+
+        # When the sketches not found should be looked up again, from the
+        # earliest, as all of them are remembered for the same ttl.
+        self._missing_until: "collections.OrderedDict[str, float]" = (
+            collections.OrderedDict()
+        )
+
+    async def _look_up_layers(self, skt_path: str) -> str:
+        layer_skt_path = await self._ctx._run_in_executor(
+            self._executor, _find_layer_file, self._root_paths, skt_path
+        )
+
+        if layer_skt_path is not None:
+            self._layer_paths[skt_path] = layer_skt_path
+
+            return layer_skt_path
+
+        self._layer_paths.pop(skt_path, None)
+
+        now = time.monotonic()
+
+        with self._cache_lock:
+            while self._missing_until:
+                first_skt_path, first_missing_until = next(
+                    iter(self._missing_until.items())
+                )
+
+                if first_missing_until > now:
+                    break
+
+                del self._missing_until[first_skt_path]
+
+            self._missing_until.pop(skt_path, None)
+            self._missing_until[skt_path] = now + self._miss_ttl
+
+        raise exceptions.SketchNotFoundError(
+            f"No such file {skt_path} in {self._root_paths}."
+        )
+
+    async def _find_layer_path(self, skt_path: str) -> str:
+        layer_skt_path = self._layer_paths.get(skt_path)
+
+        if layer_skt_path is not None:
+            return layer_skt_path
+
+        missing_until = self._missing_until.get(skt_path)
+
+        if missing_until is not None:
+            if time.monotonic() < missing_until:
+                raise exceptions.SketchNotFoundError(
+                    f"No such file {skt_path} in {self._root_paths}."
+                )
+
+        return await self._look_up_layers(skt_path)
+
+    async def _list_sketch_paths(self) -> List[str]:
+        skt_paths: Set[str] = set()
+
+        for root_path in self._root_paths:
+            skt_paths.update(
+                await self._ctx._run_in_executor(
+                    self._executor, _walk_root, root_path
+                )
+            )
+
+        return sorted(skt_paths)
+
+    async def _find_abs_path(
+        self, skt_path: str, origin_path: Optional[str] = None
+    ) -> str:
+        final_skt_path = _resolve_virtual_path(
+            skt_path, origin_path=origin_path
+        )
+
+        await self._find_layer_path(final_skt_path)
+
+        return final_skt_path
+
+    async def _get_sketch_stamp(self, skt_path: str) -> Tuple[str, int, int]:
+        # Look up all the root paths again, so the sketch is reloaded when
+        # it is overridden.
+        layer_skt_path = await self._look_up_layers(skt_path)
+
+        return (
+            layer_skt_path,
+            *await self._ctx._run_in_executor(
+                self._executor, _get_file_stamp, layer_skt_path
+            ),
+        )
+
+    async def _load_sketch_content(self, skt_path: str) -> bytes:
+        layer_skt_path = await self._find_layer_path(skt_path)
+
+        try:
+            return await self._ctx._run_in_executor(
+                self._executor, _read_file, layer_skt_path
+            )
+
+        except exceptions.SketchNotFoundError:
+            # Removed after it was found.
+            self._layer_paths.pop(skt_path, None)
+
+            raise
+
+
+class DictSketchFinder(BaseSketchFinder):
+    """
+    An implementation of :class:`.BaseSketchFinder` loading sketches from a
+    mapping of paths to contents, with no I/O.
+
+    Paths are resolved with the same rules as :class:`.SyncSketchFinder`,
+    where the root is the root of the mapping.
+
+    :arg __sketches: The mapping of paths to contents of the sketches. The
+        mapping is copied upon initialization. This argument must be passed
+        positionally and must be the first argument.
+    :arg skt_ctx: The :class:`.BaseSketchContext` to be used by the
+        :class:`.DictSketchFinder` and :class:`.Sketch`.
+        Default: :code:`None` (Create a new :class:`.AsyncioSketchContext`
+        upon initialization).
+    """
+
+    def __init__(
+        self,
+        __sketches: Mapping[str, Union[str, bytes]],
+        *,
+        skt_ctx: Optional["context.BaseSketchContext"] = None,
+    ) -> None:
+        super().__init__(skt_ctx=skt_ctx)
+
+        self._sketches = {
+            _resolve_virtual_path(skt_path): skt_content
+            for skt_path, skt_content in __sketches.items()
+        }
+
+    async def _list_sketch_paths(self) -> List[str]:
+        return sorted(self._sketches.keys())
+
+    async def _find_abs_path(
+        self, skt_path: str, origin_path: Optional[str] = None
+    ) -> str:
+        final_skt_path = _resolve_virtual_path(
+            skt_path, origin_path=origin_path
+        )
+
+        if final_skt_path not in self._sketches:
+            raise exceptions.SketchNotFoundError(
+                f"No such sketch {final_skt_path}."
+            )
+
+        return final_skt_path
+
+    async def _load_sketch_content(self, skt_path: str) -> Union[str, bytes]:
+        try:
+            return self._sketches[skt_path]
+
+        except KeyError as e:
+            raise exceptions.SketchNotFoundError(
+                f"No such sketch {skt_path}."
+            ) from e
+
+
+class SwappableSketchFinder(BaseSketchFinder):
+    """
+    A :class:`.BaseSketchFinder` which finds sketches with the current
+    generation of finders, and can be swapped to a new generation without
+    reloading the sketches in the cache of the new generation.
+
+    Sketches keep the finder which found them, so draws started before a
+    swap include and inherit sketches from the previous generation, and
+    draws started after the swap use the new generation.
+
+    :arg __finder: The first generation. This argument must be passed
+        positionally and must be the first argument.
+    """
+
+    def __init__(self, __finder: BaseSketchFinder) -> None:
+        assert isinstance(__finder, BaseSketchFinder)
+
+        super().__init__(skt_ctx=__finder._ctx)
+
+        self._finder = __finder
+        self._generation = 0
+
+    @property
+    def finder(self) -> BaseSketchFinder:
+        """
+        The current generation.
+        """
+        return self._finder
+
+    @property
+    def generation(self) -> int:
+        """
+        The number of swaps, starting from :code:`0`.
+        """
+        return self._generation
+
+    async def _load_sketch_content(
+        self, skt_path: str
+    ) -> Union[str, bytes, memoryview]:
+        return await self._finder._load_sketch_content(skt_path)
+
+    async def _find_abs_path(
+        self, skt_path: str, origin_path: Optional[str] = None
+    ) -> str:
+        return await self._finder._find_abs_path(
+            skt_path, origin_path=origin_path
+        )
+
+    async def _find(
+        self,
+        skt_path: str,
+        origin_path: Optional[str] = None,
+        prefetched_paths: Optional[Set[str]] = None,
+    ) -> "sketch.Sketch":
+        return await self._finder._find(
+            skt_path,
+            origin_path=origin_path,
+            prefetched_paths=prefetched_paths,
+        )
+
+    def cache_info(self) -> SketchCacheInfo:
+        return self._finder.cache_info()
+
+    def freeze(self) -> None:
+        self._finder.freeze()
+
+    async def preload(
+        self,
+        patterns: Union[str, Iterable[str]] = "*",
+        *,
+        executor: Optional[concurrent.futures.Executor] = None,
+    ) -> SketchPreloadReport:
+        return await self._finder.preload(patterns, executor=executor)
+
+    async def swap(
+        self,
+        finder: BaseSketchFinder,
+        patterns: Union[str, Iterable[str]],
+        *,
+        executor: Optional[concurrent.futures.Executor] = None,
+    ) -> SketchPreloadReport:
+        """
+        Preload the sketches of :code:`finder` matching any of the
+        :code:`patterns` (see :meth:`.BaseSketchFinder.preload`), and make
+        it the current generation.
+
+        Only the sketches matching the patterns are checked, so other files
+        stored with the sketches do not stop the swap.
+
+        The sketches are found with the current generation until the swap,
+        and the swap is a single assignment, so finds are never blocked.
+
+        .. important::
+
+            If any sketch fails to load, the current generation is kept.
+            Check :code:`failed` of the returned
+            :class:`.SketchPreloadReport`.
+        """
+        assert isinstance(finder, BaseSketchFinder)
+
+        report = await finder.preload(patterns, executor=executor)
+
+        if not report.failed:
+            self._finder = finder
+            self._generation += 1
+
+        return report
 
 
 try:
-    import aiofiles
+    if sys.version_info >= (3, 9):
+        from importlib.resources import files as _resource_files
+
+    else:  # pragma: no cover
+        from importlib_resources import files as _resource_files
 
 except ImportError:  # pragma: no cover
     pass
 
 else:
 
-    class AsyncSketchFinder(BaseSketchFinder):
+    class ResourceSketchFinder(BaseSketchFinder):
         """
-        An implementation of :class:`.BaseSketchFinder` using
-        `aiofiles <https://github.com/Tinche/aiofiles>`_ to
-        load sketches from the local file system asynchronously.
+        An implementation of :class:`.BaseSketchFinder` loading sketches from
+        the resources of a package with :func:`importlib.resources.files`.
+
+        The resources are indexed upon initialization, so finding sketches
+        does not touch the file system, and sketches shipped in zipped
+        packages work as well.
 
         .. important::
 
-            This finder must be used with an asyncio event loop.
+            This finder requires Python 3.9 or later, or the
+            :code:`importlib_resources` package.
 
-        :arg __root_path: The root path of the finder. Use :code:`/` in
-            inclusion and inheritance to indicate the root path. This argument
-            must be passed positionally and must be the first argument.
-        :arg executor: The executor used by :code:`aiofiles` to load files.
-            Default: :code:`None` (Create a new executor upon initialization).
-        :arg skt_ctx: The :class:`.AsyncioSketchContext` to be used by the
-            :class:`.AsyncSketchFinder` and :class:`.Sketch`.
+        :arg __package: The package containing the sketches, or its name.
+            This argument must be passed positionally and must be the first
+            argument.
+        :arg prefix: The directory in the package used as the root.
+            Default: :code:`""` (The root of the package).
+        :arg skt_ctx: The :class:`.BaseSketchContext` to be used by the
+            :class:`.ResourceSketchFinder` and :class:`.Sketch`.
             Default: :code:`None` (Create a new :class:`.AsyncioSketchContext`
             upon initialization).
-
         """
 
         def __init__(
             self,
-            __root_path: str,
+            __package: Union[str, ModuleType],
             *,
-            executor: Optional[concurrent.futures.ThreadPoolExecutor] = None,
-            skt_ctx: Optional["context.AsyncioSketchContext"] = None,
+            prefix: str = "",
+            skt_ctx: Optional["context.BaseSketchContext"] = None,
         ) -> None:
-            assert isinstance(__root_path, str)
-
             super().__init__(skt_ctx=skt_ctx)
 
-            if not isinstance(self._ctx, context.AsyncioSketchContext):
-                raise RuntimeError(
-                    "AsyncSketchFinder can only be used with "
-                    "AsyncioSketchContext."
-                )
+            root = _resource_files(__package)
 
-            self._root_path = os.path.abspath(__root_path)
-            if not self._root_path.endswith("/"):
-                self._root_path += "/"
+            for part in prefix.split("/"):
+                if part:
+                    root = root.joinpath(part)
 
-            self._executor = (
-                executor or concurrent.futures.ThreadPoolExecutor()
-            )
-
-        async def _find_abs_path(
-            self, skt_path: str, origin_path: Optional[str] = None
-        ) -> str:
-            skt_path = skt_path.replace("\\", "/")
-            # Replace Windows Style Path to UNIX Style.
+            self._resources: Dict[str, Any] = {}
 
-            if origin_path is not None and (not os.path.isabs(skt_path)):
-                origin_dir = os.path.join(
-                    self._root_path, os.path.dirname(origin_path)
-                )
+            pending_dirs = [("/", root)]
 
-            else:
-                origin_dir = self._root_path
+            while pending_dirs:
+                dir_path, dir_resource = pending_dirs.pop()
 
-            if os.path.isabs(skt_path):
-                _, skt_path = skt_path.split("/", 1)
-                # Take out the root identifier.
+                for resource in dir_resource.iterdir():
+                    if resource.is_dir():
+                        pending_dirs.append(
+                            (f"{dir_path}{resource.name}/", resource)
+                        )
 
-            final_skt_path = os.path.abspath(
-                os.path.join(origin_dir, skt_path)
-            )
-            final_skt_dir = os.path.dirname(final_skt_path)
+                    elif resource.is_file():
+                        self._resources[
+                            f"{dir_path}{resource.name}"
+                        ] = resource
 
-            if not final_skt_dir.endswith("/"):
-                final_skt_dir += "/"
+        async def _list_sketch_paths(self) -> List[str]:
+            return sorted(self._resources.keys())
 
-            if not final_skt_path.startswith(self._root_path):
-                raise exceptions.SketchNotFoundError(
-                    "To prevent potential directory traversal attack, "
-                    "this path is not acceptable."
-                )
+        async def _find_abs_path(
+            self, skt_path: str, origin_path: Optional[str] = None
+        ) -> str:
+            final_skt_path = _resolve_virtual_path(
+                skt_path, origin_path=origin_path
+            )
 
-            if not os.path.exists(final_skt_path):
+            if final_skt_path not in self._resources:
                 raise exceptions.SketchNotFoundError(
-                    f"No such file {final_skt_path}."
+                    f"No such resource {final_skt_path}."
                 )
 
             return final_skt_path
 
         async def _load_sketch_content(self, skt_path: str) -> bytes:
-            async with aiofiles.open(
-                skt_path, mode="rb", executor=self._executor
-            ) as skt_fp:
-                return await skt_fp.read()
+            try:
+                resource = self._resources[skt_path]
+
+            except KeyError as e:
+                raise exceptions.SketchNotFoundError(
+                    f"No such resource {skt_path}."
+                ) from e
+
+            return resource.read_bytes()  # type: ignore
 
-    __all__.append("AsyncSketchFinder")
+    __all__.append("ResourceSketchFinder")
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+#   Copyright 2021 Kaede Hoshikawa
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+from typing import Dict, Mapping, NamedTuple, Optional, Union
+import hashlib
+import json
+import os
+
+from . import exceptions
+
+__all__ = ["SketchManifestEntry", "SketchManifest"]
+
+_MANIFEST_VERSION = 1
+
+
+class SketchManifestEntry(NamedTuple):
+    """
+    The size and the SHA-256 hash of a sketch in a :class:`.SketchManifest`.
+    """
+
+    size: int
+    sha256: str
+
+
+class SketchManifest:
+    """
+    The list of the sketches under a root path with their sizes and hashes,
+    built when deploying and loaded by finders.
+
+    Finders with a manifest look up sketches in the manifest instead of
+    the file system, and verify sketches against the manifest when loading
+    them.
+
+    :arg __entries: The entries of the manifest by the paths of the
+        sketches, which start with :code:`/` and are relative to the root
+        path. This argument must be passed positionally and must be the first
+        argument.
+    """
+
+    def __init__(self, __entries: Mapping[str, SketchManifestEntry]) -> None:
+        self._entries = dict(__entries)
+
+    @property
+    def entries(self) -> Mapping[str, SketchManifestEntry]:
+        return self._entries
+
+    def __contains__(self, skt_path: object) -> bool:
+        return skt_path in self._entries
+
+    def get(self, skt_path: str) -> Optional[SketchManifestEntry]:
+        return self._entries.get(skt_path)
+
+    def verify(
+        self, skt_path: str, skt_content: Union[bytes, memoryview]
+    ) -> None:
+        """
+        Verify the content of a sketch against the manifest.
+
+        .. warning::
+
+            If the sketch is not in the manifest, or its size or hash does
+            not match, this method will raise a
+            :class:`.SketchIntegrityError`.
+        """
+        entry = self._entries.get(skt_path)
+
+        if entry is None:
+            raise exceptions.SketchIntegrityError(
+                f"Sketch {skt_path} is not in the manifest."
+            )
+
+        if (
+            len(skt_content) != entry.size
+            or hashlib.sha256(skt_content).hexdigest() != entry.sha256
+        ):
+            raise exceptions.SketchIntegrityError(
+                f"Sketch {skt_path} does not match the manifest."
+            )
+
+    @classmethod
+    def build(cls, root_path: str) -> "SketchManifest":
+        """
+        Build the manifest of all files under the root path.
+        """
+        root_path = os.path.abspath(root_path)
+        entries: Dict[str, SketchManifestEntry] = {}
+
+        for dir_path, _, file_names in os.walk(root_path):
+            for file_name in file_names:
+                file_path = os.path.join(dir_path, file_name)
+
+                with open(file_path, "rb") as f:
+                    skt_content = f.read()
+
+                skt_path = "/" + os.path.relpath(file_path, root_path).replace(
+                    os.sep, "/"
+                )
+                entries[skt_path] = SketchManifestEntry(
+                    size=len(skt_content),
+                    sha256=hashlib.sha256(skt_content).hexdigest(),
+                )
+
+        return cls(entries)
+
+    @classmethod
+    def load(cls, manifest_path: str) -> "SketchManifest":
+        """
+        Load the manifest from a JSON file written by :meth:`dump`.
+        """
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest_json = json.load(f)
+
+        manifest_version = manifest_json.get("version")
+
+        if manifest_version != _MANIFEST_VERSION:
+            raise ValueError(
+                f"Unsupported manifest version: {manifest_version}."
+            )
+
+        return cls(
+            {
+                skt_path: SketchManifestEntry(
+                    size=entry["size"], sha256=entry["sha256"]
+                )
+                for skt_path, entry in manifest_json["sketches"].items()
+            }
+        )
+
+    def dump(self, manifest_path: str) -> None:
+        """
+        Write the manifest to a JSON file.
+        """
+        manifest_json = {
+            "version": _MANIFEST_VERSION,
+            "sketches": {
+                skt_path: entry._asdict()
+                for skt_path, entry in sorted(self._entries.items())
+            },
+        }
+
+        with open(manifest_path, "w", encoding="utf-8") as f:
+            json.dump(manifest_json, f, indent=2)
+            f.write("\n")
@@ -16,7 +16,7 @@
 #   limitations under the License.
 
 from typing import List
-import io
+import re
 import typing
 
 from . import exceptions, statements
@@ -26,9 +26,11 @@ if typing.TYPE_CHECKING:
 
 __all__ = ["SketchParser"]
 
+# <%% is the escape of <%.
+_BEGIN_MARK_RE = re.compile(r"<%(%?)")
 
-class _ReadFinished(Exception):
-    pass
+# %%> is the escape of %>.
+_END_MARK_RE = re.compile(r"(%?)%>")
 
 
 class SketchParser:
@@ -40,84 +42,31 @@ class SketchParser:
         self._skt = __skt
         self._ctx = self._skt._ctx
 
-        self._io = io.StringIO(self._skt._content)
+        self._content = self._skt._content
+        self._pos = 0
 
-        self._current_line_no = 0
-        self._current_line = ""
+        # Line numbers are only counted up to the statements that need them.
+        self._counted_pos = 0
+        self._counted_line_no = 1
 
         self._root = statements.Root(skt=self._skt)
         self._indents: List[statements.IndentMixIn] = []
 
         self._parse()
 
-    def _move_to_next_line(self) -> None:
-        assert not self._current_line, (
-            "Parsing of the last line is not completed "
-            f"in file {self._skt._path} at line {self._current_line_no}."
-        )
-
-        new_line = self._io.readline()
-
-        if not new_line:
-            raise _ReadFinished
-
-        self._current_line_no += 1
-        self._current_line = new_line
-
     @property
     def root(self) -> "statements.Root":
         return self._root
 
-    def _find_next_begin_mark(self) -> int:
-        start_pos = 0
-
-        while True:
-            pos = self._current_line.find("<%", start_pos)
-
-            if pos == -1:
-                return -1
-
-            elif self._current_line[pos + 2 :].startswith("%"):
-                start_pos = pos + 2
-                end_pos = start_pos + 1
-
-                self._current_line = (
-                    self._current_line[:start_pos]
-                    + self._current_line[end_pos:]
-                )
-
-                continue
-
-            else:
-                return pos
-
-    def _find_next_end_mark(self) -> int:
-        start_pos = 0
-
-        while True:
-            pos = self._current_line.find("%>", start_pos)
-
-            if pos == -1:
-                return -1
-
-            elif pos == 0:
-                return 0
-
-            elif self._current_line[:pos].endswith("%"):
-                start_pos = pos - 1
-                end_pos = pos
+    def _get_line_no(self, pos: int) -> int:
+        assert pos >= self._counted_pos, "Line numbers are counted forward."
 
-                self._current_line = (
-                    self._current_line[:start_pos]
-                    + self._current_line[end_pos:]
-                )
-
-                start_pos = pos + 1
-
-                continue
+        self._counted_line_no += self._content.count(
+            "\n", self._counted_pos, pos
+        )
+        self._counted_pos = pos
 
-            else:
-                return pos
+        return self._counted_line_no
 
     def _parse_stmt(
         self, stmt_str: str, line_no: int
@@ -131,7 +80,9 @@ class SketchParser:
                 "please see the documation."
             )
 
-        for stmt_cls in self._ctx.stmt_classes:
+        keyword = stmt_str.split(" ", 1)[0]
+
+        for stmt_cls in self._ctx._get_stmt_classes(keyword):
             maybe_stmt = stmt_cls.try_match(
                 stmt_str, skt=self._skt, line_no=line_no
             )
@@ -147,63 +98,69 @@ class SketchParser:
                 f"in file {self._skt._path} at line {line_no}."
             )
 
-    def _find_next_stmt(self) -> "statements.Statement":
-        stmt_chunks: List[str] = []
-        begin_mark_line_no = -1
+    def _find_next_plain(self) -> str:
+        """
+        Read the plain text until the next begin mark or the end of the
+        content.
+        """
+        plain_chunks: List[str] = []
 
         while True:
-            if not self._current_line:
-                try:
-                    self._move_to_next_line()
-
-                except _ReadFinished:
-                    if begin_mark_line_no != -1:
-                        raise exceptions.SketchSyntaxError(
-                            (
-                                "Cannot find end mark for begin mark "
-                                f"in file {self._skt._path} "
-                                f"at line {begin_mark_line_no}."
-                            )
-                        )
-
-                    elif stmt_chunks:
-                        return statements.Plain("".join(stmt_chunks))
+            begin_mark = _BEGIN_MARK_RE.search(self._content, self._pos)
 
-                    raise
+            if begin_mark is None:
+                plain_chunks.append(self._content[self._pos :])
+                self._pos = len(self._content)
 
-            if begin_mark_line_no == -1:
-                begin_mark_pos = self._find_next_begin_mark()
+                return "".join(plain_chunks)
 
-                if begin_mark_pos == -1:
-                    stmt_chunks.append(self._current_line)
-                    self._current_line = ""
+            if begin_mark.group(1):
+                # Keep <% of the escaped begin mark.
+                plain_chunks.append(
+                    self._content[self._pos : begin_mark.start() + 2]
+                )
+                self._pos = begin_mark.end()
 
-                    continue
+                continue
 
-                elif begin_mark_pos > 0:
-                    stmt_chunks.append(self._current_line[:begin_mark_pos])
-                    self._current_line = self._current_line[begin_mark_pos:]
+            plain_chunks.append(self._content[self._pos : begin_mark.start()])
+            self._pos = begin_mark.start()
 
-                    return statements.Plain("".join(stmt_chunks))
+            return "".join(plain_chunks)
 
-                elif stmt_chunks:
-                    return statements.Plain("".join(stmt_chunks))
+    def _find_next_stmt(self) -> "statements.Statement":
+        """
+        Read the statement starting at the current begin mark.
+        """
+        line_no = self._get_line_no(self._pos)
+        self._pos += 2
 
-                begin_mark_line_no = self._current_line_no
-                self._current_line = self._current_line[2:]
+        stmt_chunks: List[str] = []
 
-            end_mark_pos = self._find_next_end_mark()
+        while True:
+            end_mark = _END_MARK_RE.search(self._content, self._pos)
+
+            if end_mark is None:
+                raise exceptions.SketchSyntaxError(
+                    (
+                        "Cannot find end mark for begin mark "
+                        f"in file {self._skt._path} "
+                        f"at line {line_no}."
+                    )
+                )
 
-            if end_mark_pos == -1:
-                stmt_chunks.append(self._current_line)
-                self._current_line = ""
+            if end_mark.group(1):
+                # Keep %> of the escaped end mark.
+                stmt_chunks.append(self._content[self._pos : end_mark.start()])
+                stmt_chunks.append("%>")
+                self._pos = end_mark.end()
 
                 continue
 
-            stmt_chunks.append(self._current_line[:end_mark_pos])
-            self._current_line = self._current_line[end_mark_pos + 2 :]
+            stmt_chunks.append(self._content[self._pos : end_mark.start()])
+            self._pos = end_mark.end()
 
-            return self._parse_stmt("".join(stmt_chunks), begin_mark_line_no)
+            return self._parse_stmt("".join(stmt_chunks), line_no)
 
     def _append_to_current(self, stmt: "statements.AppendMixIn") -> None:
         if self._indents:
@@ -220,17 +177,21 @@ class SketchParser:
 
         raise exceptions.SketchSyntaxError(
             "Redundant Unindent Statement "
-            f"in file {self._skt._path} at line {self._current_line_no}."
+            f"in file {self._skt._path} at line {self._counted_line_no}."
         )
 
     def _parse(self) -> None:
-        while True:
-            try:
-                stmt = self._find_next_stmt()
+        while self._pos < len(self._content):
+            plain_str = self._find_next_plain()
 
-            except _ReadFinished:
+            if plain_str:
+                self._append_to_current(statements.Plain(plain_str))
+
+            if self._pos >= len(self._content):
                 break
 
+            stmt = self._find_next_stmt()
+
             if isinstance(stmt, statements.UnindentMixIn):
                 self._unindent_current()
 
@@ -16,7 +16,7 @@
 #   limitations under the License.
 
 from types import CodeType
-from typing import Any, Optional
+from typing import Any, Dict, List, Mapping, Optional, Sequence
 import typing
 
 if typing.TYPE_CHECKING:
@@ -44,6 +44,9 @@ class PythonPrinter:
         self._end = end
         self._indent_mark = indent_mark
 
+        self._escape_fn_vars: Dict[str, str] = {}
+        self._static_deps: List[str] = []
+
         self._finished = False
 
     def writeline(
@@ -91,6 +94,40 @@ class PythonPrinter:
     def __exit__(self, *exc: Any) -> None:
         self._dec_indent_num()
 
+    def get_escape_fn_var(self, escape_fn_name: str) -> str:
+        """
+        Return the name of the variable holding the escape function.
+        """
+        if escape_fn_name not in self._escape_fn_vars:
+            self._escape_fn_vars[
+                escape_fn_name
+            ] = f"_skt_escape_{len(self._escape_fn_vars)}"
+
+        return self._escape_fn_vars[escape_fn_name]
+
+    @property
+    def escape_fn_vars(self) -> Mapping[str, str]:
+        """
+        The escape functions used by the printed code and their variable
+        names.
+        """
+        return self._escape_fn_vars
+
+    def add_static_dep(self, skt_path: str) -> None:
+        """
+        Record a statically known sketch included or inherited by a string
+        literal, including the ones in conditional or loop statements.
+        """
+        if skt_path not in self._static_deps:
+            self._static_deps.append(skt_path)
+
+    @property
+    def static_deps(self) -> Sequence[str]:
+        """
+        The paths of the sketches included or inherited by string literals.
+        """
+        return self._static_deps
+
     @property
     def finished(self) -> bool:  # pragma: no cover
         return self._finished
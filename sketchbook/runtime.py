@@ -15,8 +15,22 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
-from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Type, Union
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Coroutine,
+    Dict,
+    Generator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+)
 import abc
+import types
 import typing
 
 from . import exceptions
@@ -29,6 +43,85 @@ if typing.TYPE_CHECKING:
 
 __all__ = ["BlockStorage", "BlockRuntime", "SketchRuntime"]
 
+_DrawFn = Callable[[Any], Awaitable[None]]
+
+
+def _join_segments(segments: List[Any]) -> str:
+    """
+    Join an output buffer into a string.
+
+    Buffers of included sketches and blocks are nested into the buffer of the
+    runtime drawing them instead of being copied, so the buffer is flattened
+    here, once.
+    """
+    parts: List[str] = []
+    seg_iters = [iter(segments)]
+
+    while seg_iters:
+        for seg in seg_iters[-1]:
+            if seg.__class__ is list:
+                seg_iters.append(iter(seg))
+                break
+
+            parts.append(seg)
+
+        else:
+            seg_iters.pop()
+
+    return "".join(parts)
+
+
+class _FlushRequest:
+    """
+    Awaited by the runtime to hand a chunk to the streaming consumer.
+    """
+
+    def __init__(self, chunk: str) -> None:
+        self.chunk = chunk
+
+    def __await__(self) -> Generator[Any, None, None]:
+        yield self
+
+
+@types.coroutine
+def _draw_until_flush(
+    draw_coro: Coroutine[Any, Any, None]
+) -> Generator[Any, Any, Optional[str]]:
+    """
+    Drive the drawing coroutine until it flushes a chunk or finishes.
+
+    Anything else yielded by the coroutine belongs to the event loop, and is
+    passed through as is. Hence, this works with both asyncio and curio.
+    """
+    sent: Any = None
+    thrown: Optional[BaseException] = None
+
+    while True:
+        try:
+            if thrown is None:
+                yielded = draw_coro.send(sent)
+
+            else:
+                yielded = draw_coro.throw(thrown)
+
+        except StopIteration:
+            return None
+
+        if isinstance(yielded, _FlushRequest):
+            return yielded.chunk
+
+        try:
+            sent = yield yielded
+            thrown = None
+
+        except GeneratorExit:
+            draw_coro.close()
+            raise
+
+        except BaseException as e:
+            sent = None
+            thrown = e
+
 
 class BlockStorage:
     """
@@ -53,13 +146,15 @@ class BlockStorage:
 
     """
 
-    def __init__(self, skt_rt: "SketchRuntime") -> None:
+    def __init__(
+        self, skt_rt: "SketchRuntime", draw_block_fns: Mapping[str, _DrawFn]
+    ) -> None:
         self._skt_rt: SketchRuntime
-        self._blocks: Dict[str, Type[BlockRuntime]]
+        self._blocks: Dict[str, _DrawFn]
         self.__dict__["_skt_rt"] = skt_rt
         self.__dict__["_blocks"] = {}
 
-        self._blocks.update(**self._skt_rt._BLOCK_RUNTIMES)
+        self._blocks.update(draw_block_fns)
 
     def __getitem__(
         self, name: Union[str, Tuple[str, bool]]
@@ -74,10 +169,8 @@ class BlockStorage:
         if block_name not in self._blocks.keys():
             raise KeyError(f"Unknown Block Name {block_name}.")
 
-        block_rt_cls = self._blocks[block_name]
-
         async def wrapper() -> str:
-            block_rt = block_rt_cls(self._skt_rt, _defined_here=defined_here)
+            block_rt = self._get_block_runtime(block_name, defined_here)
 
             await block_rt._draw()
 
@@ -97,6 +190,15 @@ class BlockStorage:
 
     __setattr__ = __setitem__
 
+    def _get_block_runtime(
+        self, block_name: str, defined_here: bool
+    ) -> "BlockRuntime":
+        return BlockRuntime(
+            self._skt_rt,
+            _defined_here=defined_here,
+            _draw_block_fn=self._blocks[block_name],
+        )
+
     def _update(self, child_store: "BlockStorage") -> None:
         for k, v in child_store._blocks.items():
             if k not in self._blocks.keys():
@@ -106,6 +208,11 @@ class BlockStorage:
 
 
 class _AbstractRuntime(abc.ABC):
+    _skt_buf: List[Any]
+
+    # The runtime whose buffer contains the buffer of this runtime.
+    _output_rt: Optional["_AbstractRuntime"] = None
+
     @property
     @abc.abstractmethod
     def _finder(self) -> "finders.BaseSketchFinder":  # pragma: no cover
@@ -162,9 +269,62 @@ class _AbstractRuntime(abc.ABC):
         raise NotImplementedError
 
     @abc.abstractmethod
-    async def _include_sketch(self, path: str) -> str:  # pragma: no cover
+    async def _include_sketch(self, path: str) -> None:  # pragma: no cover
         raise NotImplementedError
 
+    def _splice(self, rt: "_AbstractRuntime") -> None:
+        self._skt_buf.append(rt._skt_buf)
+        rt._output_rt = self
+
+    def _take_output(self) -> Optional[str]:
+        """
+        Take the output written so far out of the buffers.
+
+        Returns :code:`None` if the output cannot be sent yet.
+        """
+        if self._output_rt is None:
+            return None
+
+        chunk = self._output_rt._take_output()
+
+        if chunk is None:
+            return None
+
+        # The buffer of the output runtime has been emptied, the buffer of
+        # this runtime is now at the end of it.
+        self._skt_buf.clear()
+        self._output_rt._skt_buf.append(self._skt_buf)
+
+        return chunk
+
+    async def flush(self) -> None:
+        """
+        Send the output written so far to the consumer of
+        :meth:`.Sketch.stream`.
+
+        This has no effect when the sketch is drawn with :meth:`.Sketch.draw`,
+        or when the output cannot be sent yet (e.g.: the body of a sketch
+        that inherits from another sketch, or a block drawn with
+        :code:`self.blocks`).
+
+        .. important::
+
+            This method must be awaited directly inside the sketch, not in a
+            separate task.
+        """
+        chunk = self._take_output()
+
+        if chunk:
+            await _FlushRequest(chunk)
+
+    async def _write_block(self, block_name: str) -> None:
+        block_rt = self.blocks._get_block_runtime(
+            block_name, defined_here=True
+        )
+
+        self._splice(block_rt)
+        await block_rt._draw()
+
     @abc.abstractmethod
     async def _draw(self) -> None:  # pragma: no cover
         raise NotImplementedError
@@ -183,11 +343,17 @@ class BlockRuntime(_AbstractRuntime):
         first.
     """
 
-    def __init__(self, __skt_rt: "SketchRuntime", _defined_here: bool) -> None:
+    def __init__(
+        self,
+        __skt_rt: "SketchRuntime",
+        _defined_here: bool,
+        _draw_block_fn: _DrawFn,
+    ) -> None:
         self._skt_rt = __skt_rt
         self._defined_here = _defined_here
+        self._draw_block_fn = _draw_block_fn
 
-        self.__skt_result__ = ""
+        self._skt_buf = []
 
         self._finished = False
 
@@ -218,7 +384,7 @@ class BlockRuntime(_AbstractRuntime):
                 "Drawing has not been finished yet."
             )
 
-        return self.__skt_result__
+        return _join_segments(self._skt_buf)
 
     @property
     def blocks(self) -> BlockStorage:
@@ -228,7 +394,7 @@ class BlockRuntime(_AbstractRuntime):
         if self._finished:
             raise exceptions.SketchDrawingError("Drawing has been finished.")
 
-        self.__skt_result__ += self.ctx.escape_fns[escape](__content)
+        self._skt_buf.append(self.ctx.escape_fns[escape](__content))
 
     @property
     def body(self) -> str:
@@ -248,8 +414,11 @@ class BlockRuntime(_AbstractRuntime):
             "Cannot Set Inheritance inside the block."
         )
 
-    async def _include_sketch(self, path: str) -> str:
-        return await self._skt_rt._include_sketch(path)
+    async def _include_sketch(self, path: str) -> None:
+        skt_rt = await self._skt_rt._get_included_runtime(path)
+
+        self._splice(skt_rt)
+        await skt_rt._draw()
 
     async def _draw(self) -> None:
         if self._finished:
@@ -266,9 +435,8 @@ class BlockRuntime(_AbstractRuntime):
 
         self._finished = True
 
-    @abc.abstractmethod
-    async def _draw_block(self) -> None:  # pragma: no cover
-        raise NotImplementedError
+    async def _draw_block(self) -> None:
+        await self._draw_block_fn(self)
 
 
 class SketchRuntime(_AbstractRuntime):
@@ -279,20 +447,23 @@ class SketchRuntime(_AbstractRuntime):
     when drawing sketches.
     """
 
-    _BLOCK_RUNTIMES: Dict[str, Type[BlockRuntime]] = {}
-
     def __init__(
         self, skt: "sketch.Sketch", skt_globals: Dict[str, Any]
     ) -> None:
         self._skt = skt
         self._skt_globals = skt_globals
 
-        self.__skt_result__ = ""
+        self._draw_body_fn, draw_block_fns = skt._bind_draw_fns(skt_globals)
 
-        self._body: Optional[str] = None
+        self._skt_buf = []
+
+        self._body: Optional[List[Any]] = None
         self._parent: Optional[SketchRuntime] = None
 
-        self._block_store = BlockStorage(self)
+        self._body_drawn = False
+        self._streaming = False
+
+        self._block_store = BlockStorage(self, draw_block_fns)
 
         self._finished = False
 
@@ -306,14 +477,7 @@ class SketchRuntime(_AbstractRuntime):
         return self._skt._finder
 
     def _get_globals(self) -> Dict[str, Any]:
-        new_globals = {}
-
-        new_globals.update(self._skt_globals)
-
-        if "_SktCurrentRuntime" in new_globals:
-            del new_globals["_SktCurrentRuntime"]
-
-        return new_globals
+        return self._skt_globals.copy()
 
     @property
     def _skt_result(self) -> str:
@@ -322,7 +486,7 @@ class SketchRuntime(_AbstractRuntime):
                 "Drawing has not been finished yet."
             )
 
-        return self.__skt_result__
+        return _join_segments(self._skt_buf)
 
     @property
     def ctx(self) -> "context.BaseSketchContext":
@@ -352,7 +516,7 @@ class SketchRuntime(_AbstractRuntime):
         if self._finished:
             raise exceptions.SketchDrawingError("Drawing has been finished.")
 
-        self.__skt_result__ += self.ctx.escape_fns[escape](__content)
+        self._skt_buf.append(self.ctx.escape_fns[escape](__content))
 
     @property
     def body(self) -> str:
@@ -367,7 +531,7 @@ class SketchRuntime(_AbstractRuntime):
         if self._body is None:
             raise AttributeError("Inheritance is not enabled.")
 
-        return self._body
+        return _join_segments(self._body)
 
     @property
     def parent(self) -> "SketchRuntime":
@@ -384,10 +548,26 @@ class SketchRuntime(_AbstractRuntime):
 
         return self._parent
 
+    def _take_output(self) -> Optional[str]:
+        if self._parent is not None and not self._body_drawn:
+            # The body is going to be drawn by the parent.
+            return None
+
+        if self._output_rt is not None:
+            return super()._take_output()
+
+        if not self._streaming:
+            return None
+
+        chunk = _join_segments(self._skt_buf)
+        self._skt_buf.clear()
+
+        return chunk
+
     def _update_blocks(self, child_store: BlockStorage) -> None:
         self._block_store._update(child_store)
 
-    def _update_body(self, body: str) -> None:
+    def _update_body(self, body: List[Any]) -> None:
         assert self._body is None, "There's already a child body."
         self._body = body
 
@@ -395,13 +575,18 @@ class SketchRuntime(_AbstractRuntime):
         if self._parent is None:
             return
 
-        self._parent._update_body(self.__skt_result__)
+        # The buffer may already be nested in the buffer of the runtime
+        # including this sketch, so it is emptied in place rather than
+        # replaced.
+        body = self._skt_buf[:]
+        self._skt_buf.clear()
+
+        self._parent._update_body(body)
         self._parent._update_blocks(self._block_store)
 
+        self._splice(self._parent)
         await self._parent._draw()
 
-        self.__skt_result__ = self._parent._skt_result
-
     async def _add_parent(self, path: str) -> None:
         assert (
             self._parent is None
@@ -413,13 +598,16 @@ class SketchRuntime(_AbstractRuntime):
 
         self._parent = parent_skt._get_runtime(skt_globals=self._get_globals())
 
-    async def _include_sketch(self, path: str) -> str:
+    async def _get_included_runtime(self, path: str) -> "SketchRuntime":
         skt = await self._finder._find(path, origin_path=self._skt._path)
 
-        skt_rt = skt._get_runtime(self._get_globals())
+        return skt._get_runtime(self._get_globals())
+
+    async def _include_sketch(self, path: str) -> None:
+        skt_rt = await self._get_included_runtime(path)
 
+        self._splice(skt_rt)
         await skt_rt._draw()
-        return skt_rt._skt_result
 
     async def _draw(self) -> None:
         if self._finished:
@@ -428,10 +616,32 @@ class SketchRuntime(_AbstractRuntime):
             )
 
         await self._draw_body()
+        self._body_drawn = True
 
         await self._inherit_sketch()
         self._finished = True
 
-    @abc.abstractmethod
-    async def _draw_body(self) -> None:  # pragma: no cover
-        raise NotImplementedError
+    async def _stream(self) -> AsyncIterator[str]:
+        self._streaming = True
+
+        draw_coro = self._draw()
+
+        try:
+            while True:
+                chunk = await _draw_until_flush(draw_coro)
+
+                if chunk is None:
+                    break
+
+                yield chunk
+
+        finally:
+            draw_coro.close()
+
+        chunk = self._take_output()
+
+        if chunk:
+            yield chunk
+
+    async def _draw_body(self) -> None:
+        await self._draw_body_fn(self)
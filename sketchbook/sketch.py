@@ -15,8 +15,21 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
-from types import CodeType
-from typing import Any, Mapping, Optional, Union
+from types import CodeType, FunctionType
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
+import builtins
+import marshal
+import sys
 import typing
 
 from . import context, parser, printer, runtime
@@ -27,6 +40,8 @@ if typing.TYPE_CHECKING:
 
 __all__ = ["Sketch"]
 
+_TSketch = TypeVar("_TSketch", bound="Sketch")
+
 
 class Sketch:
     """
@@ -35,10 +50,10 @@ class Sketch:
     :class:`.Sketch` can be initialized directly with arguments, or
     by a subclass of :class:`.BaseSketchFinder`.
 
-    :arg __content: The content of this sketch. This can be a string or a
-        bytestring. If a bytestring
-        is passed, the content will be decoded with :code:`source_encoding`
-        from :code:`skt_ctx`.
+    :arg __content: The content of this sketch. This can be a string, a
+        bytestring or a :class:`memoryview` of bytes. If a bytestring or a
+        :class:`memoryview` is passed, the content will be decoded with
+        :code:`source_encoding` from :code:`skt_ctx`.
         This argument must be passed positionally and must be the first
         argument.
     :arg path: The path of the sketch, used by :class:`.SketchFinder` to
@@ -52,11 +67,25 @@ class Sketch:
 
     def __init__(
         self,
-        __content: Union[str, bytes],
+        __content: Union[str, bytes, memoryview],
         *,
         path: str = "<string>",
         skt_ctx: Optional["context.BaseSketchContext"] = None,
         finder: Optional["finders.BaseSketchFinder"] = None,
+    ) -> None:
+        self._setup(__content, path=path, skt_ctx=skt_ctx, finder=finder)
+
+        if not hasattr(self, "_printed_skt"):
+            # Parse the sketch now to raise syntax errors early.
+            self._parsed_root = parser.SketchParser.parse_sketch(self)
+
+    def _setup(
+        self,
+        __content: Union[str, bytes, memoryview],
+        *,
+        path: str,
+        skt_ctx: Optional["context.BaseSketchContext"],
+        finder: Optional["finders.BaseSketchFinder"],
     ) -> None:
         self._path = path
 
@@ -64,32 +93,147 @@ class Sketch:
 
         self._finder = finder
 
-        if isinstance(__content, bytes):
-            self._content = __content.decode(self._ctx.source_encoding)
+        if isinstance(__content, (bytes, memoryview)):
+            self._content = str(__content, self._ctx.source_encoding)
 
         else:
             self._content = __content
 
-        self._root = parser.SketchParser.parse_sketch(self)
+        bytecode_cache = self._ctx._bytecode_cache
+
+        if bytecode_cache is not None:
+            printed_skt = bytecode_cache.load(self)
+
+            if printed_skt is not None:
+                # The sketch has been parsed when it was cached.
+                self._printed_skt = printed_skt
+
+    @classmethod
+    def _create_unparsed(
+        cls: Type[_TSketch],
+        __content: Union[str, bytes, memoryview],
+        *,
+        path: str = "<string>",
+        skt_ctx: Optional["context.BaseSketchContext"] = None,
+        finder: Optional["finders.BaseSketchFinder"] = None,
+    ) -> _TSketch:
+        """
+        Create a sketch without parsing it, so it can be compiled elsewhere
+        and set with :meth:`_set_compiled_code`.
+        """
+        skt = cls.__new__(cls)
+        skt._setup(__content, path=path, skt_ctx=skt_ctx, finder=finder)
+
+        return skt
+
+    def _set_compiled_code(self, code: CodeType) -> None:
+        self._printed_skt = code
+
+        if self._ctx._bytecode_cache is not None:
+            self._ctx._bytecode_cache.store(self, code)
+
+    @property
+    def _root(self) -> "statements.Root":
+        if not hasattr(self, "_parsed_root"):
+            self._parsed_root = parser.SketchParser.parse_sketch(self)
+
+        return self._parsed_root
 
     @property
     def _compiled_code(self) -> CodeType:
         if not hasattr(self, "_printed_skt"):
-            self._printed_skt = printer.PythonPrinter.print_sketch(self)
+            self._set_compiled_code(printer.PythonPrinter.print_sketch(self))
 
         return self._printed_skt
 
-    def _get_runtime(
-        self, skt_globals: Mapping[str, Any]
-    ) -> runtime.SketchRuntime:
-        skt_globals = skt_globals
+    def _estimate_size(self) -> int:
+        """
+        Estimate the memory used by the sketch in bytes.
+
+        This compiles the sketch if it is not compiled. The parse tree is
+        counted as another copy of the source, which is roughly the text
+        held by its statements.
+        """
+        if not hasattr(self, "_content"):  # Frozen.
+            return len(marshal.dumps(self._compiled_code))
 
-        exec(self._compiled_code, skt_globals)  # type: ignore
+        size = sys.getsizeof(self._content)
+
+        if hasattr(self, "_parsed_root"):
+            size += sys.getsizeof(self._content)
+
+        return size + len(marshal.dumps(self._compiled_code))
+
+    def _freeze(self) -> None:
+        """
+        Compile the sketch and drop the source and the parse tree, which are
+        only needed to compile it.
+        """
+        self._draw_fns
+
+        if hasattr(self, "_parsed_root"):
+            del self._parsed_root
+
+        if hasattr(self, "_content"):
+            del self._content
+
+    @property
+    def _draw_fns(self) -> Tuple[FunctionType, Dict[str, FunctionType]]:
+        if not hasattr(self, "_skt_draw_fns"):
+            # The compiled module only defines functions, so it is executed
+            # once per sketch. Each draw rebinds them to its own globals.
+            skt_ns: Dict[str, Any] = {}
+            exec(self._compiled_code, skt_ns)
 
-        return skt_globals["_SktCurrentRuntime"](  # type: ignore
-            self, skt_globals=skt_globals
+            self._skt_draw_fns: Tuple[
+                FunctionType, Dict[str, FunctionType]
+            ] = skt_ns["_skt_bind_escape_fns"](self._ctx.escape_fns)
+
+            self._skt_static_deps: Tuple[str, ...] = skt_ns.get(
+                "_SKT_STATIC_DEPS", ()
+            )
+
+        return self._skt_draw_fns
+
+    @property
+    def _static_deps(self) -> Tuple[str, ...]:
+        """
+        The paths of the sketches included or inherited by string literals
+        in this sketch, as written in the sketch. These are statically known,
+        so inclusions in branches which are never taken are listed as well.
+
+        This compiles the sketch if it is not compiled.
+        """
+        self._draw_fns
+
+        return self._skt_static_deps
+
+    def _bind_draw_fns(
+        self, skt_globals: Dict[str, Any]
+    ) -> Tuple[FunctionType, Dict[str, FunctionType]]:
+        def bind_fn(fn: FunctionType) -> FunctionType:
+            return FunctionType(
+                fn.__code__,
+                skt_globals,
+                fn.__name__,
+                fn.__defaults__,
+                fn.__closure__,
+            )
+
+        draw_body_fn, draw_block_fns = self._draw_fns
+
+        return (
+            bind_fn(draw_body_fn),
+            {k: bind_fn(v) for k, v in draw_block_fns.items()},
         )
 
+    def _get_runtime(
+        self, skt_globals: Dict[str, Any]
+    ) -> runtime.SketchRuntime:
+        skt_globals.setdefault("__builtins__", builtins)
+
+        return runtime.SketchRuntime(self, skt_globals=skt_globals)
+
     async def draw(self, **kwargs: Any) -> str:
         """
         Draw the sketch to :code:`str`.
@@ -106,3 +250,50 @@ class Sketch:
         await runtime._draw()
 
         return runtime._skt_result
+
+    def stream(self, **kwargs: Any) -> AsyncIterator[str]:
+        """
+        Draw the sketch, and yield the output in chunks as they are flushed.
+
+        The output is flushed by :code:`<% flush %>` statements or
+        :meth:`.SketchRuntime.flush`, and the rest of the output is yielded
+        when the drawing finishes.
+
+        Example::
+
+            async for chunk in skt.stream(handler=handler):
+                await send(chunk)
+
+        :arg \\*\\*kwargs: All the keyword arguments will become global
+            variables in the runtime.
+
+        .. warning::
+
+            The exceptions raised in the runtime will pop up from the
+            iteration.
+        """
+        runtime = self._get_runtime(skt_globals=kwargs)
+
+        return runtime._stream()
+
+
+def _compile_sketch(
+    __content: Union[str, bytes, memoryview],
+    path: str,
+    escape_fn_names: Sequence[str],
+    source_encoding: str,
+) -> bytes:
+    """
+    Compile a sketch in a thread or another process, and return the
+    marshalled code.
+
+    Escape functions are only looked up by their names when compiling, so
+    the context is created with placeholders of them.
+    """
+    skt_ctx = context.AsyncioSketchContext(
+        source_encoding=source_encoding,
+        custom_escape_fns={name: str for name in escape_fn_names},
+    )
+    skt = Sketch(__content, path=path, skt_ctx=skt_ctx)
+
+    return marshal.dumps(skt._compiled_code)
@@ -17,6 +17,7 @@
 
 from typing import Dict, List, Optional, Sequence, Type
 import abc
+import ast
 import re
 
 from . import exceptions, printer, sketch
@@ -42,6 +43,44 @@ def _is_valid_fn_name(maybe_fn_name: str) -> bool:
     return re.fullmatch(_VALID_FN_NAME_RE, maybe_fn_name) is not None
 
 
+def _add_static_dep(
+    target_path: str, py_printer: printer.PythonPrinter
+) -> None:
+    try:
+        maybe_skt_path = ast.literal_eval(target_path)
+
+    except Exception:  # Not a literal.
+        return
+
+    if isinstance(maybe_skt_path, str):
+        py_printer.add_static_dep(maybe_skt_path)
+
+
+def _print_stmts(
+    stmts: Sequence["AppendMixIn"], py_printer: printer.PythonPrinter
+) -> None:
+    """
+    Print the statements, merging adjacent plain strings (including the ones
+    only separated by comments) into one.
+    """
+    plain_strs: List[str] = []
+
+    for stmt in stmts:
+        if isinstance(stmt, Plain):
+            plain_strs.append(stmt._plain_str)
+
+            continue
+
+        if plain_strs and not isinstance(stmt, _Comment):
+            Plain("".join(plain_strs)).print_code(py_printer)
+            plain_strs.clear()
+
+        stmt.print_code(py_printer)
+
+    if plain_strs:
+        Plain("".join(plain_strs)).print_code(py_printer)
+
+
 class IndentMixIn(abc.ABC):
     @abc.abstractmethod
     def append_stmt(self, stmt: "AppendMixIn") -> None:  # pragma: no cover
@@ -71,6 +110,14 @@ class UnindentMixIn(abc.ABC):
 
 
 class Statement(abc.ABC):
+    # The keywords (the first word of a statement) to be matched by this
+    # statement, or None to be tried on every statement.
+    _keywords: Optional[Sequence[str]] = None
+
+    @classmethod
+    def _get_keywords(cls) -> Optional[Sequence[str]]:
+        return cls._keywords
+
     @classmethod
     @abc.abstractmethod
     def try_match(
@@ -112,25 +159,37 @@ class Root(Statement, AppendMixIn):
         raise NotImplementedError("This does not apply to Root.")
 
     def print_code(self, py_printer: printer.PythonPrinter) -> None:
-        py_printer.writeline("import sketchbook")
-        py_printer.writeline("_SKT_BLOCK_RUNTIMES = {}")
+        # The escape functions are bound to the draw functions as closure
+        # variables, so they are not looked up when drawing.
+        py_printer.writeline("def _skt_bind_escape_fns(_skt_escape_fns):")
+        with py_printer.indent_block():
+            py_printer.writeline("_SKT_BLOCK_FNS = {}")
 
-        for block_stmt in self._block_stmts.values():
-            block_stmt.print_block_code(py_printer)
+            for block_stmt in self._block_stmts.values():
+                block_stmt.print_block_code(py_printer)
+
+            py_printer.writeline(
+                "async def _skt_draw_body(self) -> None:", self
+            )
+            with py_printer.indent_block():
+                py_printer.writeline("_skt_append = self._skt_buf.append")
+                _print_stmts(self._stmts, py_printer)
+
+            for fn_name, fn_var in py_printer.escape_fn_vars.items():
+                py_printer.writeline(
+                    f"{fn_var} = _skt_escape_fns[{fn_name!r}]"
+                )
+
+            py_printer.writeline("return _skt_draw_body, _SKT_BLOCK_FNS")
 
         py_printer.writeline(
-            "class _SktCurrentRuntime(sketchbook.SketchRuntime):", self
+            f"_SKT_STATIC_DEPS = {tuple(py_printer.static_deps)!r}"
         )
-        with py_printer.indent_block():
-            py_printer.writeline("_BLOCK_RUNTIMES = _SKT_BLOCK_RUNTIMES", self)
-
-            py_printer.writeline("async def _draw_body(self) -> None:", self)
-            with py_printer.indent_block():
-                for stmt in self._stmts:
-                    stmt.print_code(py_printer)
 
 
 class Block(Statement, IndentMixIn, AppendMixIn):
+    _keywords = ("block",)
+
     def __init__(
         self, block_name: str, skt: sketch.Sketch, line_no: int
     ) -> None:
@@ -174,24 +233,17 @@ class Block(Statement, IndentMixIn, AppendMixIn):
 
     def print_code(self, py_printer: printer.PythonPrinter) -> None:
         py_printer.writeline(
-            f"self.write(await self.blocks[{repr(self.block_name)}, True](), "
-            'escape="raw")',
-            self,
+            f"await self._write_block({self.block_name!r})", self
         )
 
     def print_block_code(self, py_printer: printer.PythonPrinter) -> None:
-        py_printer.writeline(
-            "class _SktCurrentBlockRuntime(sketchbook.BlockRuntime):", self
-        )
+        py_printer.writeline("async def _skt_draw_block(self) -> None:", self)
         with py_printer.indent_block():
-            py_printer.writeline("async def _draw_block(self) -> None:", self)
-            with py_printer.indent_block():
-                for stmt in self._stmts:
-                    stmt.print_code(py_printer)
+            py_printer.writeline("_skt_append = self._skt_buf.append")
+            _print_stmts(self._stmts, py_printer)
 
         py_printer.writeline(
-            f"_SKT_BLOCK_RUNTIMES[{self.block_name!r}] = "
-            "_SktCurrentBlockRuntime"
+            f"_SKT_BLOCK_FNS[{self.block_name!r}] = _skt_draw_block"
         )
 
 
@@ -210,14 +262,22 @@ class Plain(Statement, AppendMixIn):
         raise NotImplementedError("This does not apply to Plain.")
 
     def print_code(self, py_printer: printer.PythonPrinter) -> None:
-        py_printer.writeline(
-            f'self.write({repr(self._plain_str)}, escape="raw")'
-        )
+        # Appended to the buffer directly, plain strings need no escaping.
+        py_printer.writeline(f"_skt_append({self._plain_str!r})")
 
 
 class BaseOutput(Statement, AppendMixIn):
     _filter_fn_names: List[str] = []
 
+    @classmethod
+    def _get_keywords(cls) -> Optional[Sequence[str]]:
+        keywords = [f"{fn_name}=" for fn_name in cls._filter_fn_names]
+
+        if "default" in cls._filter_fn_names:
+            keywords.append("=")
+
+        return keywords
+
     def __init__(
         self,
         output_filter: str,
@@ -276,13 +336,16 @@ class BaseOutput(Statement, AppendMixIn):
         )
 
     def print_code(self, py_printer: printer.PythonPrinter) -> None:
+        escape_fn_var = py_printer.get_escape_fn_var(self._output_filter)
+
         py_printer.writeline(
-            f"self.write({self._output_exp}, "
-            f"escape={self._output_filter!r})"
+            f"_skt_append({escape_fn_var}({self._output_exp}))"
         )
 
 
 class _Include(Statement, AppendMixIn):
+    _keywords = ("include",)
+
     def __init__(
         self, target_path: str, skt: sketch.Sketch, line_no: int
     ) -> None:
@@ -312,14 +375,16 @@ class _Include(Statement, AppendMixIn):
         return cls(target_path=splitted_stmt[1], skt=skt, line_no=line_no)
 
     def print_code(self, py_printer: printer.PythonPrinter) -> None:
+        _add_static_dep(self._target_path, py_printer)
+
         py_printer.writeline(
-            "self.write(await "
-            f'self._include_sketch({self._target_path}), escape="raw")',
-            self,
+            f"await self._include_sketch({self._target_path})", self
         )
 
 
 class _Inherit(Statement, AppendMixIn):
+    _keywords = ("inherit",)
+
     def __init__(
         self, target_path: str, skt: sketch.Sketch, line_no: int
     ) -> None:
@@ -348,12 +413,47 @@ class _Inherit(Statement, AppendMixIn):
         return cls(target_path=splitted_stmt[1], skt=skt, line_no=line_no)
 
     def print_code(self, py_printer: printer.PythonPrinter) -> None:
+        _add_static_dep(self._target_path, py_printer)
+
         py_printer.writeline(
             f"await self._add_parent({self._target_path})", self
         )
 
 
+class _Flush(Statement, AppendMixIn):
+    _keywords = ("flush",)
+
+    def __init__(self, skt: sketch.Sketch, line_no: int) -> None:
+        self._skt = skt
+        self._line_no = line_no
+
+    @property
+    def line_no(self) -> int:
+        return self._line_no
+
+    @classmethod
+    def try_match(
+        cls, stmt_str: str, skt: sketch.Sketch, line_no: int
+    ) -> Optional["Statement"]:
+        splitted_stmt = stmt_str.split(" ", 1)
+        if splitted_stmt[0] != "flush":
+            return None
+
+        if len(splitted_stmt) != 1 and splitted_stmt[1].strip():
+            raise exceptions.SketchSyntaxError(
+                f"Invalid syntax in file {skt._path} at line {line_no}, "
+                "flush statement takes no argument."
+            )
+
+        return cls(skt=skt, line_no=line_no)
+
+    def print_code(self, py_printer: printer.PythonPrinter) -> None:
+        py_printer.writeline("await self.flush()", self)
+
+
 class _Indent(Statement, IndentMixIn, AppendMixIn):
+    _keywords = ("if", "with", "for", "while", "try", "async")
+
     def __init__(
         self, stmt_str: str, skt: sketch.Sketch, line_no: int
     ) -> None:
@@ -374,14 +474,7 @@ class _Indent(Statement, IndentMixIn, AppendMixIn):
     def try_match(
         cls, stmt_str: str, skt: sketch.Sketch, line_no: int
     ) -> Optional["Statement"]:
-        if stmt_str.split(" ", 1)[0] not in (
-            "if",
-            "with",
-            "for",
-            "while",
-            "try",
-            "async",
-        ):
+        if stmt_str.split(" ", 1)[0] not in cls._keywords:
             return None
 
         return cls(stmt_str=stmt_str.strip(), skt=skt, line_no=line_no)
@@ -390,13 +483,14 @@ class _Indent(Statement, IndentMixIn, AppendMixIn):
         py_printer.writeline(f"{self._stmt_str}:", self)
 
         with py_printer.indent_block():
-            for stmt in self._stmts:
-                stmt.print_code(py_printer)
+            _print_stmts(self._stmts, py_printer)
 
             py_printer.writeline("pass", self)
 
 
 class _Unindent(Statement, UnindentMixIn):
+    _keywords = ("end",)
+
     @classmethod
     def try_match(
         cls, stmt_str: str, skt: sketch.Sketch, line_no: int
@@ -408,6 +502,8 @@ class _Unindent(Statement, UnindentMixIn):
 
 
 class _HalfIndent(Statement, IndentMixIn, AppendMixIn, UnindentMixIn):
+    _keywords = ("else", "elif", "except", "finally")
+
     def __init__(
         self, stmt_str: str, skt: sketch.Sketch, line_no: int
     ) -> None:
@@ -428,12 +524,7 @@ class _HalfIndent(Statement, IndentMixIn, AppendMixIn, UnindentMixIn):
     def try_match(
         cls, stmt_str: str, skt: sketch.Sketch, line_no: int
     ) -> Optional["Statement"]:
-        if stmt_str.split(" ", 1)[0] not in (
-            "else",
-            "elif",
-            "except",
-            "finally",
-        ):
+        if stmt_str.split(" ", 1)[0] not in cls._keywords:
             return None
 
         return cls(stmt_str=stmt_str.strip(), skt=skt, line_no=line_no)
@@ -442,13 +533,23 @@ class _HalfIndent(Statement, IndentMixIn, AppendMixIn, UnindentMixIn):
         py_printer.writeline(f"{self._stmt_str}:", self)
 
         with py_printer.indent_block():
-            for stmt in self._stmts:
-                stmt.print_code(py_printer)
+            _print_stmts(self._stmts, py_printer)
 
             py_printer.writeline("pass", self)
 
 
 class _Inline(Statement, AppendMixIn):
+    _keywords = (
+        "break",
+        "continue",
+        "import",
+        "raise",
+        "from",
+        "nonlocal",
+        "global",
+        "assert",
+    )
+
     def __init__(
         self, stmt_str: str, skt: sketch.Sketch, line_no: int
     ) -> None:
@@ -464,16 +565,7 @@ class _Inline(Statement, AppendMixIn):
     def try_match(
         cls, stmt_str: str, skt: sketch.Sketch, line_no: int
     ) -> Optional["Statement"]:
-        if stmt_str.split(" ", 1)[0] not in (
-            "break",
-            "continue",
-            "import",
-            "raise",
-            "from",
-            "nonlocal",
-            "global",
-            "assert",
-        ):
+        if stmt_str.split(" ", 1)[0] not in cls._keywords:
             return None
 
         return cls(stmt_str=stmt_str.strip(), skt=skt, line_no=line_no)
@@ -509,6 +601,8 @@ class _Comment(Statement, AppendMixIn):
 
 
 class _Assign(Statement, AppendMixIn):
+    _keywords = ("let",)
+
     def __init__(
         self, target_lst: str, exp: str, skt: sketch.Sketch, line_no: int
     ) -> None:
@@ -556,6 +650,7 @@ builtin_stmt_classes: Sequence[Type[Statement]] = [
     Block,
     _Include,
     _Inherit,
+    _Flush,
     _Indent,
     _Unindent,
     _HalfIndent,
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+#   Copyright 2021 Kaede Hoshikawa
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import os
+import tempfile
+
+from sketchbook import Sketch
+
+_TEST_CURIO = bool(os.environ.get("TEST_CURIO", False))
+
+if _TEST_CURIO:
+    from sketchbook import CurioSketchContext as SketchContext
+    from sketchbook.testutils import CurioTestHelper
+
+    helper = CurioTestHelper(__file__)
+
+else:
+    from sketchbook import AsyncioSketchContext as SketchContext
+    from sketchbook.testutils import AsyncioTestHelper
+
+    helper = AsyncioTestHelper(__file__)
+
+
+class BytecodeCacheTestCase:
+    @helper.force_sync
+    async def test_cache_reused(self) -> None:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            skt_ctx = SketchContext(bytecode_cache_dir=cache_dir)
+            skt = Sketch("Hello, <%= name %>!", skt_ctx=skt_ctx)
+
+            assert await skt.draw(name="world") == "Hello, world!"
+            assert len(os.listdir(cache_dir)) == 1
+
+            skt_ctx = SketchContext(bytecode_cache_dir=cache_dir)
+            cached_skt = Sketch("Hello, <%= name %>!", skt_ctx=skt_ctx)
+
+            # Loaded from the cache, without parsing.
+            assert not hasattr(cached_skt, "_parsed_root")
+            assert await cached_skt.draw(name="world") == "Hello, world!"
+
+            other_skt = Sketch("Bye, <%= name %>!", skt_ctx=skt_ctx)
+            assert hasattr(other_skt, "_parsed_root")
+            assert await other_skt.draw(name="world") == "Bye, world!"
+
+            assert len(os.listdir(cache_dir)) == 2
+
+    @helper.force_sync
+    async def test_broken_cache_ignored(self) -> None:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            skt_ctx = SketchContext(bytecode_cache_dir=cache_dir)
+            skt = Sketch("<%= str(1 + 1) %>", skt_ctx=skt_ctx)
+            await skt.draw()
+
+            for cache_name in os.listdir(cache_dir):
+                with open(os.path.join(cache_dir, cache_name), "r+b") as f:
+                    f.truncate(6)
+
+            skt = Sketch("<%= str(1 + 1) %>", skt_ctx=skt_ctx)
+            assert hasattr(skt, "_parsed_root")
+            assert await skt.draw() == "2"
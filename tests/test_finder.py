@@ -15,27 +15,62 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
+from typing import Any
+import asyncio
+import concurrent.futures
+import errno
+import gc
 import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import zipfile
 
 import pytest
 
-from sketchbook import SketchNotFoundError
+from sketchbook import (
+    Sketch,
+    SketchIntegrityError,
+    SketchNotFoundError,
+    SketchSyntaxError,
+    _inotify,
+)
+from sketchbook.__main__ import main
+from sketchbook.manifest import SketchManifest
+import sketchbook
 
 _TEST_CURIO = bool(os.environ.get("TEST_CURIO", False))
 
 if _TEST_CURIO:
-    from sketchbook import CurioSketchContext, SyncSketchFinder
+    from sketchbook import (
+        CurioSketchContext,
+        DictSketchFinder,
+        LayeredSketchFinder,
+        SwappableSketchFinder,
+        SyncSketchFinder,
+        ZipSketchFinder,
+    )
     from sketchbook.testutils import CurioTestHelper
 
     helper = CurioTestHelper(__file__)
 
     default_skt_ctx = CurioSketchContext()
 
+    import curio
+
+    run_coro = curio.run
+
 else:
     from sketchbook import (
         AsyncioSketchContext,
         AsyncSketchFinder,
+        DictSketchFinder,
+        LayeredSketchFinder,
+        SwappableSketchFinder,
         SyncSketchFinder,
+        ZipSketchFinder,
     )
     from sketchbook.testutils import AsyncioTestHelper
 
@@ -43,6 +78,8 @@ else:
 
     default_skt_ctx = AsyncioSketchContext()
 
+    run_coro = asyncio.run
+
 
 if not _TEST_CURIO:
 
@@ -86,6 +123,1023 @@ if not _TEST_CURIO:
             # Test Sketch Cache Disabled.
             assert loaded_skt is not sec_loaded_skt
 
+    class ConcurrentFindTestCase:
+        @helper.force_sync
+        async def test_concurrent_find(self) -> None:
+            loaded_paths = []
+            slow_loading = asyncio.Event()
+
+            class _SlowSketchFinder(SyncSketchFinder):
+                async def _load_sketch_content(self, abs_skt_path: str) -> str:
+                    loaded_paths.append(abs_skt_path)
+
+                    if abs_skt_path.endswith("main.html"):
+                        slow_loading.set()
+                        await asyncio.sleep(0.1)
+
+                    return await super()._load_sketch_content(abs_skt_path)
+
+            finder = _SlowSketchFinder(
+                helper.abspath("sketches"), skt_ctx=default_skt_ctx
+            )
+            header_skt = await finder.find("header.html")
+
+            slow_finds = asyncio.gather(
+                *[finder.find("main.html") for _ in range(10)]
+            )
+            await slow_loading.wait()
+
+            # Cache hits are not blocked by the sketch being loaded.
+            assert await finder.find("header.html") is header_skt
+            assert not slow_finds.done()
+
+            main_skts = await slow_finds
+
+            # Concurrent finds of the same sketch are loaded only once.
+            assert all(skt is main_skts[0] for skt in main_skts)
+            assert loaded_paths == [
+                helper.abspath("sketches/header.html"),
+                helper.abspath("sketches/main.html"),
+            ]
+
+
+class ZipSketchFinderTestCase:
+    def _create_archive(self, archive_path: str) -> None:
+        with zipfile.ZipFile(archive_path, "w") as archive:
+            for dir_path, _, file_names in os.walk(helper.abspath("sketches")):
+                for file_name in file_names:
+                    file_path = os.path.join(dir_path, file_name)
+                    member_name = os.path.relpath(
+                        file_path, helper.abspath("sketches")
+                    )
+
+                    archive.write(
+                        file_path,
+                        f"sketches/{member_name}",
+                        # Store layout.html without compression.
+                        compress_type=zipfile.ZIP_STORED
+                        if file_name == "layout.html"
+                        else zipfile.ZIP_DEFLATED,
+                    )
+
+    @helper.force_sync
+    async def test_find(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_path:
+            archive_path = os.path.join(tmp_path, "sketches.zip")
+            self._create_archive(archive_path)
+
+            finder = ZipSketchFinder(
+                archive_path, prefix="sketches", skt_ctx=default_skt_ctx
+            )
+            dir_finder = SyncSketchFinder(
+                helper.abspath("sketches"), skt_ctx=default_skt_ctx
+            )
+
+            layout_content = await finder._load_sketch_content("/layout.html")
+            assert isinstance(layout_content, memoryview)
+
+            for skt_path in ("index.html", "main.html", "nested/index.html"):
+                skt = await finder.find(skt_path)
+                dir_skt = await dir_finder.find(skt_path)
+
+                assert skt._path == "/" + skt_path
+                assert skt._content == dir_skt._content
+                assert await skt.draw() == await dir_skt.draw()
+
+            with pytest.raises(SketchNotFoundError):
+                await finder.find("phantasm.html")
+
+            with pytest.raises(SketchNotFoundError):
+                await finder._find_abs_path("../sketches/main.html")
+
+            with pytest.raises(SketchNotFoundError):
+                await finder._find_abs_path(
+                    "../../header.html", origin_path="/nested/index.html"
+                )
+
+            layout_content.release()
+            finder.close()
+
+            # Sketches found before are still drawn.
+            assert await skt.draw() == await dir_skt.draw()
+
+            with pytest.raises(RuntimeError):
+                await finder._load_sketch_content("/layout.html")
+
+
+class LayeredSketchFinderTestCase:
+    def _write_sketch(self, skt_path: str, skt_content: str) -> None:
+        os.makedirs(os.path.dirname(skt_path), exist_ok=True)
+
+        with open(skt_path, "w") as f:
+            f.write(skt_content)
+
+    @helper.force_sync
+    async def test_find(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_path:
+            tenant_path = os.path.join(tmp_path, "tenant")
+            base_path = os.path.join(tmp_path, "base")
+
+            self._write_sketch(
+                os.path.join(base_path, "pages/index.html"),
+                '<% include "header.html" %>, <% include "/footer.html" %>',
+            )
+            self._write_sketch(
+                os.path.join(base_path, "pages/header.html"), "Header"
+            )
+            self._write_sketch(
+                os.path.join(base_path, "footer.html"), "Footer"
+            )
+            self._write_sketch(
+                os.path.join(tenant_path, "pages/header.html"), "Tenant Header"
+            )
+
+            finder = LayeredSketchFinder(
+                [tenant_path, base_path], miss_ttl=60, skt_ctx=default_skt_ctx
+            )
+
+            skt = await finder.find("pages/index.html")
+            assert skt._path == "/pages/index.html"
+            assert await skt.draw() == "Tenant Header, Footer"
+
+            assert await finder._list_sketch_paths() == [
+                "/footer.html",
+                "/pages/header.html",
+                "/pages/index.html",
+            ]
+
+            with pytest.raises(SketchNotFoundError):
+                await finder.find("phantasm.html")
+
+            self._write_sketch(os.path.join(base_path, "phantasm.html"), "")
+
+            # Misses are cached until the ttl passes.
+            with pytest.raises(SketchNotFoundError):
+                await finder.find("phantasm.html")
+
+            with pytest.raises(SketchNotFoundError):
+                await finder._find_abs_path("../base/footer.html")
+
+    @helper.force_sync
+    async def test_auto_reload_override(self) -> None:
+        if _TEST_CURIO:
+            skt_ctx = CurioSketchContext(
+                auto_reload=True, auto_reload_interval=0
+            )
+
+        else:
+            skt_ctx = AsyncioSketchContext(
+                auto_reload=True, auto_reload_interval=0
+            )
+
+        with tempfile.TemporaryDirectory() as tmp_path:
+            tenant_path = os.path.join(tmp_path, "tenant")
+            base_path = os.path.join(tmp_path, "base")
+            os.mkdir(tenant_path)
+
+            self._write_sketch(os.path.join(base_path, "index.html"), "Base")
+
+            finder = LayeredSketchFinder(
+                [tenant_path, base_path], miss_ttl=0, skt_ctx=skt_ctx
+            )
+
+            assert await (await finder.find("index.html")).draw() == "Base"
+
+            self._write_sketch(
+                os.path.join(tenant_path, "index.html"), "Tenant"
+            )
+            assert await (await finder.find("index.html")).draw() == "Tenant"
+
+            os.unlink(os.path.join(tenant_path, "index.html"))
+            assert await (await finder.find("index.html")).draw() == "Base"
+
+    @helper.force_sync
+    async def test_prune_misses(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_path:
+            finder = LayeredSketchFinder(
+                [tmp_path], miss_ttl=0, skt_ctx=default_skt_ctx
+            )
+
+            for i in range(10):
+                with pytest.raises(SketchNotFoundError):
+                    await finder.find(f"phantasm-{i}.html")
+
+            # Expired misses are dropped when a new miss is remembered.
+            assert list(finder._missing_until) == ["/phantasm-9.html"]
+
+    @helper.force_sync
+    async def test_look_up_in_executor(self) -> None:
+        submitted_fns = []
+
+        class _RecordingExecutor(concurrent.futures.ThreadPoolExecutor):
+            def submit(self, fn: Any, *args: Any, **kwargs: Any) -> Any:
+                submitted_fns.append(fn.__name__)
+
+                return super().submit(fn, *args, **kwargs)
+
+        with tempfile.TemporaryDirectory() as tmp_path:
+            self._write_sketch(os.path.join(tmp_path, "index.html"), "Index")
+
+            with _RecordingExecutor(1) as executor:
+                finder = LayeredSketchFinder(
+                    [tmp_path], executor=executor, skt_ctx=default_skt_ctx
+                )
+
+                assert await (await finder.find("index.html")).draw() == (
+                    "Index"
+                )
+
+                with pytest.raises(SketchNotFoundError):
+                    await finder.find("phantasm.html")
+
+        assert submitted_fns.count("_find_layer_file") == 2
+        assert "_read_file" in submitted_fns
+
+
+class SketchManifestTestCase:
+    def test_build(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_path:
+            manifest_path = os.path.join(tmp_path, "manifest.json")
+            assert (
+                main(["manifest", helper.abspath("sketches"), manifest_path])
+                == 0
+            )
+
+            skt_manifest = SketchManifest.load(manifest_path)
+
+        assert skt_manifest.entries == (
+            SketchManifest.build(helper.abspath("sketches")).entries
+        )
+        assert "/nested/index.html" in skt_manifest
+        assert skt_manifest.get("/index.html").size == os.path.getsize(
+            helper.abspath("sketches/index.html")
+        )
+
+        with open(helper.abspath("sketches/index.html"), "rb") as f:
+            skt_manifest.verify("/index.html", f.read())
+
+        with pytest.raises(SketchIntegrityError):
+            skt_manifest.verify("/index.html", b"Changed")
+
+        with pytest.raises(SketchIntegrityError):
+            skt_manifest.verify("/phantasm.html", b"")
+
+    @helper.force_sync
+    async def test_find(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_path:
+            root_path = os.path.join(tmp_path, "sketches")
+            shutil.copytree(helper.abspath("sketches"), root_path)
+
+            manifest_path = os.path.join(tmp_path, "manifest.json")
+            SketchManifest.build(root_path).dump(manifest_path)
+
+            with open(os.path.join(root_path, "extra.html"), "w") as f:
+                f.write("Not in the manifest.")
+
+            with open(os.path.join(root_path, "header.html"), "a") as f:
+                f.write("Changed after the manifest is built.")
+
+            finder = SyncSketchFinder(
+                root_path, skt_ctx=default_skt_ctx, manifest_path=manifest_path
+            )
+
+            skt = await finder.find("nested/index.html")
+            assert skt._path == os.path.join(root_path, "nested/index.html")
+
+            # Files not in the manifest are not found.
+            with pytest.raises(SketchNotFoundError):
+                await finder.find("extra.html")
+
+            with pytest.raises(SketchIntegrityError):
+                await finder.find("header.html")
+
+            assert "/extra.html" not in await finder._list_sketch_paths()
+
+            if not _TEST_CURIO:
+                async_finder = AsyncSketchFinder(
+                    root_path, manifest_path=manifest_path
+                )
+
+                assert await async_finder.find("nested/index.html")
+
+                with pytest.raises(SketchNotFoundError):
+                    await async_finder.find("extra.html")
+
+                with pytest.raises(SketchIntegrityError):
+                    await async_finder.find("header.html")
+
+
+class ThreadSafeFinderTestCase:
+    def test_shared_by_threads(self) -> None:
+        if _TEST_CURIO:
+            skt_ctx = CurioSketchContext(thread_safe=True)
+
+        else:
+            skt_ctx = AsyncioSketchContext(thread_safe=True)
+
+        class _SlowSketchFinder(SyncSketchFinder):
+            async def _load_sketch_content(self, abs_skt_path: str) -> bytes:
+                # Block the thread, so all the threads load at the same time.
+                time.sleep(0.05)
+
+                return await super()._load_sketch_content(abs_skt_path)
+
+        finder = _SlowSketchFinder(helper.abspath("sketches"), skt_ctx=skt_ctx)
+
+        results = {}
+
+        async def draw_index() -> None:
+            skt = await finder.find("index.html")
+            results[threading.get_ident()] = (skt, await skt.draw())
+
+        def run_thread() -> None:
+            run_coro(draw_index())
+
+        threads = [threading.Thread(target=run_thread) for _ in range(4)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        # All the threads use the sketch kept in the cache.
+        cached_skt = finder._skt_cache[helper.abspath("sketches/index.html")]
+
+        assert len(results) == 4
+        assert all(skt is cached_skt for skt, _ in results.values())
+        assert len({drawn for _, drawn in results.values()}) == 1
+        assert finder.cache_info().size == 2
+
+
+class DictSketchFinderTestCase:
+    @helper.force_sync
+    async def test_find(self) -> None:
+        finder = DictSketchFinder(
+            {
+                "index.html": '<% include "/parts/header.html" %>, Index',
+                "parts/header.html": '<% include "title.html" %>',
+                "/parts/title.html": b"Title",
+            },
+            skt_ctx=default_skt_ctx,
+        )
+
+        skt = await finder.find("index.html")
+
+        assert skt._path == "/index.html"
+        assert await skt.draw() == "Title, Index"
+
+        with pytest.raises(SketchNotFoundError):
+            await finder.find("phantasm.html")
+
+        with pytest.raises(SketchNotFoundError):
+            await finder._find_abs_path(
+                "../../index.html", origin_path="/parts/header.html"
+            )
+
+
+class SwappableSketchFinderTestCase:
+    @helper.force_sync
+    async def test_swap(self) -> None:
+        finder = SwappableSketchFinder(
+            DictSketchFinder(
+                {
+                    "index.html": '1.<% include "part.html" %>',
+                    "part.html": "A",
+                },
+                skt_ctx=default_skt_ctx,
+            )
+        )
+
+        old_skt = await finder.find("index.html")
+        assert await old_skt.draw() == "1.A"
+
+        report = await finder.swap(
+            DictSketchFinder(
+                {
+                    "index.html": '2.<% include "part.html" %>',
+                    "part.html": "B",
+                },
+                skt_ctx=default_skt_ctx,
+            ),
+            "*",
+        )
+
+        assert sorted(report.loaded) == ["/index.html", "/part.html"]
+        assert finder.generation == 1
+
+        misses = finder.cache_info().misses
+        assert await (await finder.find("index.html")).draw() == "2.B"
+
+        # The new generation is warmed up before the swap.
+        assert finder.cache_info().misses == misses
+
+        # Sketches found before the swap still draw with their generation.
+        assert await old_skt.draw() == "1.A"
+
+        report = await finder.swap(
+            DictSketchFinder(
+                {"index.html": "<% if %>"}, skt_ctx=default_skt_ctx
+            ),
+            "*",
+        )
+
+        # Broken generations are not swapped in.
+        assert isinstance(report.failed["/index.html"], SketchSyntaxError)
+        assert finder.generation == 1
+        assert await (await finder.find("index.html")).draw() == "2.B"
+
+    @helper.force_sync
+    async def test_swap_with_other_files(self) -> None:
+        finder = SwappableSketchFinder(
+            DictSketchFinder({"index.html": "1"}, skt_ctx=default_skt_ctx)
+        )
+
+        with tempfile.TemporaryDirectory() as root_path:
+            with open(os.path.join(root_path, "index.html"), "w") as f:
+                f.write("2")
+
+            with open(os.path.join(root_path, "logo.png"), "wb") as f:
+                f.write(b"\x89PNG\r\n\x1a\n\xff\xfe")
+
+            new_finder = SyncSketchFinder(root_path, skt_ctx=default_skt_ctx)
+
+            # The image is loaded as a sketch if it matches the patterns.
+            report = await finder.swap(new_finder, "*")
+            assert list(report.failed.keys()) == ["/logo.png"]
+            assert finder.generation == 0
+
+            report = await finder.swap(new_finder, "*.html")
+            assert report.failed == {}
+            assert finder.generation == 1
+
+            assert await (await finder.find("index.html")).draw() == "2"
+
+
+def _read_private_dirty_kb() -> int:
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            if line.startswith("Private_Dirty:"):
+                return int(line.split()[1])
+
+    raise RuntimeError("Private_Dirty is not found.")
+
+
+class FreezeTestCase:
+    @helper.force_sync
+    async def test_freeze(self) -> None:
+        skt_ctx = (
+            CurioSketchContext(max_cached_bytes=1024 * 1024)
+            if _TEST_CURIO
+            else AsyncioSketchContext(max_cached_bytes=1024 * 1024)
+        )
+        finder = SyncSketchFinder(helper.abspath("sketches"), skt_ctx=skt_ctx)
+        await finder.preload()
+
+        drawn = await (await finder.find("index.html")).draw()
+        nbytes = finder.cache_info().nbytes
+
+        try:
+            finder.freeze()
+
+        finally:
+            gc.unfreeze()
+
+        skt = await finder.find("index.html")
+
+        assert not hasattr(skt, "_content")
+        assert not hasattr(skt, "_parsed_root")
+        assert await skt.draw() == drawn
+
+        assert finder.cache_info().nbytes < nbytes
+
+    @helper.force_sync
+    async def test_freeze_broken_sketch(self) -> None:
+        finder = DictSketchFinder(
+            {"a.html": "A", "broken.html": "<%= 1 2 %>", "z.html": "Z"},
+            skt_ctx=default_skt_ctx,
+        )
+
+        report = await finder.preload()
+        assert list(report.failed) == ["/broken.html"]
+
+        # Found sketches are cached before they are compiled.
+        await finder.find("broken.html")
+        assert "/broken.html" in finder._skt_cache
+
+        try:
+            finder.freeze()
+            assert gc.get_freeze_count() > 0
+
+        finally:
+            gc.unfreeze()
+
+        assert sorted(finder._skt_cache.keys()) == ["/a.html", "/z.html"]
+        assert not any(
+            hasattr(skt, "_content") for skt in finder._skt_cache.values()
+        )
+
+        with pytest.raises(SyntaxError):
+            await (await finder.find("broken.html")).draw()
+
+    @pytest.mark.skipif(
+        not hasattr(os, "fork")
+        or not os.path.exists("/proc/self/smaps_rollup"),
+        reason="Private memory can only be measured on Linux.",
+    )
+    def test_fork_private_memory(self) -> None:
+        skt_count = 500
+
+        def draw_in_worker(freeze: bool) -> int:
+            finder = DictSketchFinder(
+                {
+                    f"{i}.html": "<% for x in range(3) %>"
+                    + f"<%= str(x) %>, Sketch {i}.\n" * 50
+                    + "<% end %>"
+                    for i in range(skt_count)
+                },
+                skt_ctx=default_skt_ctx,
+            )
+            run_coro(finder.preload())
+
+            if freeze:
+                finder.freeze()
+
+            read_fd, write_fd = os.pipe()
+            pid = os.fork()
+
+            if pid == 0:  # pragma: no cover
+                try:
+                    os.close(read_fd)
+                    started_kb = _read_private_dirty_kb()
+
+                    async def draw_all() -> None:
+                        for i in range(skt_count):
+                            skt = await finder.find(f"{i}.html")
+                            await skt.draw()
+
+                    run_coro(draw_all())
+                    gc.collect()
+
+                    os.write(
+                        write_fd,
+                        str(_read_private_dirty_kb() - started_kb).encode(),
+                    )
+
+                finally:
+                    os._exit(0)
+
+            try:
+                os.close(write_fd)
+                os.waitpid(pid, 0)
+
+                with os.fdopen(read_fd) as f:
+                    return int(f.read())
+
+            finally:
+                gc.unfreeze()
+
+        # Collections in workers write to every object not frozen.
+        assert draw_in_worker(freeze=True) < draw_in_worker(freeze=False)
+
+
+@pytest.mark.skipif(
+    not hasattr(sketchbook, "ResourceSketchFinder"),
+    reason="ResourceSketchFinder requires importlib.resources.files.",
+)
+class ResourceSketchFinderTestCase:
+    @helper.force_sync
+    async def test_find(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_path:
+            package_path = os.path.join(tmp_path, "skt_resources")
+            os.mkdir(package_path)
+
+            with open(os.path.join(package_path, "__init__.py"), "w"):
+                pass
+
+            shutil.copytree(
+                helper.abspath("sketches"),
+                os.path.join(package_path, "sketches"),
+            )
+
+            sys.path.insert(0, tmp_path)
+
+            try:
+                finder = sketchbook.ResourceSketchFinder(
+                    "skt_resources", prefix="sketches", skt_ctx=default_skt_ctx
+                )
+
+            finally:
+                sys.path.remove(tmp_path)
+                sys.modules.pop("skt_resources", None)
+
+            skt = await finder.find("nested/index.html")
+            dir_skt = await SyncSketchFinder(
+                helper.abspath("sketches"), skt_ctx=default_skt_ctx
+            ).find("nested/index.html")
+
+            assert skt._path == "/nested/index.html"
+            assert await skt.draw() == await dir_skt.draw()
+
+            with pytest.raises(SketchNotFoundError):
+                await finder.find("phantasm.html")
+
+
+class SketchCacheTestCase:
+    @helper.force_sync
+    async def test_max_cached_sketches(self) -> None:
+        if _TEST_CURIO:
+            skt_ctx = CurioSketchContext(max_cached_sketches=2)
+
+        else:
+            skt_ctx = AsyncioSketchContext(max_cached_sketches=2)
+
+        finder = SyncSketchFinder(helper.abspath("sketches"), skt_ctx=skt_ctx)
+
+        header_skt = await finder.find("header.html")
+        layout_skt = await finder.find("layout.html")
+
+        assert await finder.find("header.html") is header_skt
+        # Evicts the least recent layout.html, and hits the included
+        # header.html.
+        await finder.find("main.html")
+
+        assert await finder.find("header.html") is header_skt
+        assert await finder.find("layout.html") is not layout_skt
+
+        cache_info = finder.cache_info()
+        assert cache_info.hits == 3
+        assert cache_info.misses == 4
+        assert cache_info.evictions == 2
+        assert cache_info.size == 2
+        assert cache_info.max_size == 2
+
+    @helper.force_sync
+    async def test_max_cached_bytes(self) -> None:
+        finder = SyncSketchFinder(
+            helper.abspath("sketches"), skt_ctx=default_skt_ctx
+        )
+        max_cached_bytes = (await finder.find("header.html"))._estimate_size()
+        max_cached_bytes += (await finder.find("main.html"))._estimate_size()
+
+        if _TEST_CURIO:
+            skt_ctx = CurioSketchContext(max_cached_bytes=max_cached_bytes)
+
+        else:
+            skt_ctx = AsyncioSketchContext(max_cached_bytes=max_cached_bytes)
+
+        finder = SyncSketchFinder(helper.abspath("sketches"), skt_ctx=skt_ctx)
+
+        header_skt = await finder.find("header.html")
+        await finder.find("main.html")
+
+        assert finder.cache_info().nbytes == max_cached_bytes
+        assert finder.cache_info().evictions == 0
+
+        layout_skt = await finder.find("layout.html")
+
+        cache_info = finder.cache_info()
+        assert cache_info.nbytes <= max_cached_bytes
+        assert cache_info.evictions >= 1
+        assert await finder.find("layout.html") is layout_skt
+        assert await finder.find("header.html") is not header_skt
+
+
+class PrefetchTestCase:
+    @helper.force_sync
+    async def test_prefetch(self) -> None:
+        finder = SyncSketchFinder(
+            helper.abspath("sketches"), skt_ctx=default_skt_ctx
+        )
+
+        nested_skt = await finder.find("nested/index.html")
+
+        assert sorted(finder._skt_cache.keys()) == [
+            helper.abspath("sketches/header.html"),
+            helper.abspath("sketches/nested/header.html"),
+            helper.abspath("sketches/nested/index.html"),
+        ]
+
+        await nested_skt.draw()
+        assert finder.cache_info().misses == 3
+
+    @helper.force_sync
+    async def test_prefetch_literals_only(self) -> None:
+        with tempfile.TemporaryDirectory() as root_path:
+            with open(os.path.join(root_path, "index.html"), "w") as f:
+                f.write(
+                    '<% include "missing.html" %><% include "a" + ".html" %>'
+                    "<% include path %>"
+                )
+
+            with open(os.path.join(root_path, "a.html"), "w") as f:
+                f.write("a")
+
+            finder = SyncSketchFinder(root_path, skt_ctx=default_skt_ctx)
+
+            skt = await finder.find("index.html")
+
+            assert skt._static_deps == ("missing.html",)
+            assert list(finder._skt_cache.keys()) == [
+                os.path.join(os.path.realpath(root_path), "index.html")
+            ]
+
+    @helper.force_sync
+    async def test_prefetch_cycle_with_cache_cap(self) -> None:
+        skt_ctx = (
+            CurioSketchContext(max_cached_sketches=1)
+            if _TEST_CURIO
+            else AsyncioSketchContext(max_cached_sketches=1)
+        )
+        finder = DictSketchFinder(
+            {
+                "a.html": "<% if x %><% include 'b.html' %><% end %>A",
+                "b.html": "<% if x %><% include 'a.html' %><% end %>B",
+            },
+            skt_ctx=skt_ctx,
+        )
+
+        skt = await finder.find("a.html")
+
+        # A is loaded again after B evicts it, but not prefetched again.
+        assert await skt.draw(x=False) == "A"
+        assert finder.cache_info().misses == 3
+
+
+class PreloadTestCase:
+    @helper.force_sync
+    async def test_preload(self) -> None:
+        finder = SyncSketchFinder(
+            helper.abspath("sketches"), skt_ctx=default_skt_ctx
+        )
+
+        report = await finder.preload(["/nested/*", "/main.html"])
+
+        assert sorted(report.loaded.keys()) == [
+            "/main.html",
+            "/nested/header.html",
+            "/nested/index.html",
+        ]
+        assert report.failed == {}
+
+        # /header.html is included by the preloaded sketches.
+        assert finder.cache_info().size == 4
+
+        main_skt = await finder.find("main.html")
+        assert hasattr(main_skt, "_printed_skt")
+        assert finder.cache_info().misses == 4
+
+    @helper.force_sync
+    async def test_preload_failures(self) -> None:
+        with tempfile.TemporaryDirectory() as root_path:
+            with open(os.path.join(root_path, "index.html"), "w") as f:
+                f.write("<%= a %>")
+
+            with open(os.path.join(root_path, "broken.html"), "w") as f:
+                f.write("<% if a %>")
+
+            finder = SyncSketchFinder(root_path, skt_ctx=default_skt_ctx)
+
+            report = await finder.preload("*.html")
+
+            assert list(report.loaded.keys()) == ["/index.html"]
+            assert isinstance(report.failed["/broken.html"], SketchSyntaxError)
+
+    @helper.force_sync
+    async def test_preload_other_files(self) -> None:
+        with tempfile.TemporaryDirectory() as root_path:
+            with open(os.path.join(root_path, "index.html"), "w") as f:
+                f.write("<%= a %>")
+
+            with open(os.path.join(root_path, "index.html.orig"), "w") as f:
+                f.write("<% if a %>")
+
+            with open(os.path.join(root_path, "compile.html.orig"), "w") as f:
+                f.write("<%= 1 2 %>")
+
+            with open(os.path.join(root_path, "logo.png"), "wb") as f:
+                f.write(b"\x89PNG\r\n\x1a\n\xff\xfe")
+
+            finder = SyncSketchFinder(root_path, skt_ctx=default_skt_ctx)
+
+            report = await finder.preload()
+
+            # Files which are not sketches are reported, but do not stop
+            # the sketches from being preloaded.
+            assert list(report.loaded.keys()) == ["/index.html"]
+            assert sorted(report.failed.keys()) == [
+                "/compile.html.orig",
+                "/index.html.orig",
+                "/logo.png",
+            ]
+            assert isinstance(report.failed["/logo.png"], UnicodeDecodeError)
+
+            # Failed sketches are not cached.
+            assert list(finder._skt_cache.keys()) == [
+                os.path.join(os.path.realpath(root_path), "index.html")
+            ]
+
+            report = await finder.preload("*.html")
+
+            assert list(report.loaded.keys()) == ["/index.html"]
+            assert report.failed == {}
+
+    @helper.force_sync
+    async def test_preload_in_process_pool(self) -> None:
+        finder = SyncSketchFinder(
+            helper.abspath("sketches"), skt_ctx=default_skt_ctx
+        )
+
+        with concurrent.futures.ProcessPoolExecutor(2) as executor:
+            report = await finder.preload("*.html", executor=executor)
+
+        assert report.failed == {}
+
+        index_skt = await finder.find("index.html")
+        assert not hasattr(index_skt, "_parsed_root")
+
+        compiled_skt = Sketch(index_skt._content, path=index_skt._path)
+        assert index_skt._compiled_code == compiled_skt._compiled_code
+
+        assert (
+            await index_skt.draw()
+            == await (
+                await SyncSketchFinder(
+                    helper.abspath("sketches"), skt_ctx=default_skt_ctx
+                ).find("index.html")
+            ).draw()
+        )
+
+
+class CompileExecutorTestCase:
+    async def _test_compile_executor(
+        self, executor: concurrent.futures.Executor
+    ) -> None:
+        if _TEST_CURIO:
+            skt_ctx = CurioSketchContext(compile_executor=executor)
+
+        else:
+            skt_ctx = AsyncioSketchContext(compile_executor=executor)
+
+        finder = SyncSketchFinder(helper.abspath("sketches"), skt_ctx=skt_ctx)
+
+        index_skt = await finder.find("index.html")
+        assert hasattr(index_skt, "_printed_skt")
+
+        assert (
+            await index_skt.draw()
+            == await (
+                await SyncSketchFinder(
+                    helper.abspath("sketches"), skt_ctx=default_skt_ctx
+                ).find("index.html")
+            ).draw()
+        )
+
+        with tempfile.TemporaryDirectory() as root_path:
+            with open(os.path.join(root_path, "broken.html"), "w") as f:
+                f.write("<%= a b %>")
+
+            finder = SyncSketchFinder(root_path, skt_ctx=skt_ctx)
+
+            # Errors of compilation are raised when finding sketches.
+            with pytest.raises(SyntaxError):
+                await finder.find("broken.html")
+
+    @helper.force_sync
+    async def test_compile_in_thread_pool(self) -> None:
+        with concurrent.futures.ThreadPoolExecutor(1) as executor:
+            await self._test_compile_executor(executor)
+
+    @helper.force_sync
+    async def test_compile_in_process_pool(self) -> None:
+        with concurrent.futures.ProcessPoolExecutor(1) as executor:
+            await self._test_compile_executor(executor)
+
+
+class AutoReloadTestCase:
+    def _get_skt_ctx(self, **kwargs: Any) -> Any:
+        if _TEST_CURIO:
+            return CurioSketchContext(auto_reload=True, **kwargs)
+
+        return AsyncioSketchContext(auto_reload=True, **kwargs)
+
+    @helper.force_sync
+    async def test_auto_reload(self) -> None:
+        with tempfile.TemporaryDirectory() as root_path:
+            with open(os.path.join(root_path, "header.html"), "w") as f:
+                f.write("Header")
+
+            with open(os.path.join(root_path, "index.html"), "w") as f:
+                f.write('<% include "header.html" %>, Index')
+
+            finder = SyncSketchFinder(
+                root_path, skt_ctx=self._get_skt_ctx(auto_reload_interval=0)
+            )
+
+            index_skt = await finder.find("index.html")
+            assert await index_skt.draw() == "Header, Index"
+
+            with open(os.path.join(root_path, "header.html"), "w") as f:
+                f.write("New Header")
+
+            # Includes are found when drawing, so the including sketch is
+            # not reloaded.
+            assert await finder.find("index.html") is index_skt
+            assert await index_skt.draw() == "New Header, Index"
+
+            os.unlink(os.path.join(root_path, "header.html"))
+
+            with pytest.raises(SketchNotFoundError):
+                await index_skt.draw()
+
+    @helper.force_sync
+    async def test_auto_reload_interval(self) -> None:
+        with tempfile.TemporaryDirectory() as root_path:
+            with open(os.path.join(root_path, "index.html"), "w") as f:
+                f.write("Index")
+
+            finder = SyncSketchFinder(
+                root_path, skt_ctx=self._get_skt_ctx(auto_reload_interval=60)
+            )
+
+            index_skt = await finder.find("index.html")
+
+            with open(os.path.join(root_path, "index.html"), "w") as f:
+                f.write("New Index")
+
+            # Not checked until the interval passes.
+            assert await finder.find("index.html") is index_skt
+
+    @pytest.mark.skipif(
+        not _inotify.is_available(), reason="inotify is not available."
+    )
+    @helper.force_sync
+    async def test_auto_reload_inotify(self) -> None:
+        with tempfile.TemporaryDirectory() as root_path:
+            with open(os.path.join(root_path, "index.html"), "w") as f:
+                f.write("Index")
+
+            finder = SyncSketchFinder(
+                root_path,
+                skt_ctx=self._get_skt_ctx(auto_reload_interval=0.5),
+                use_inotify=True,
+            )
+
+            index_skt = await finder.find("index.html")
+            assert await finder.find("index.html") is index_skt
+
+            # Replaced like editors do.
+            with open(os.path.join(root_path, "index.html.swp"), "w") as f:
+                f.write("New Index")
+
+            os.replace(
+                os.path.join(root_path, "index.html.swp"),
+                os.path.join(root_path, "index.html"),
+            )
+
+            # Changes are not read until the interval passes.
+            assert await finder.find("index.html") is index_skt
+
+            time.sleep(0.5)
+
+            new_index_skt = await finder.find("index.html")
+            assert await new_index_skt.draw() == "New Index"
+
+    @pytest.mark.skipif(
+        not _inotify.is_available(), reason="inotify is not available."
+    )
+    @helper.force_sync
+    async def test_auto_reload_inotify_watch_failed(self) -> None:
+        with tempfile.TemporaryDirectory() as root_path:
+            with open(os.path.join(root_path, "index.html"), "w") as f:
+                f.write("Index")
+
+            finder = SyncSketchFinder(
+                root_path,
+                skt_ctx=self._get_skt_ctx(auto_reload_interval=0),
+                use_inotify=True,
+            )
+
+            def watch_dir(dir_path: str) -> None:
+                raise OSError(errno.ENOSPC, os.strerror(errno.ENOSPC))
+
+            finder._watcher.watch_dir = watch_dir  # type: ignore
+
+            with pytest.warns(RuntimeWarning):
+                index_skt = await finder.find("index.html")
+
+            assert finder.cache_info().size == 1
+
+            with open(os.path.join(root_path, "index.html"), "w") as f:
+                f.write("New Index")
+
+            # Checked by the modification time instead.
+            with pytest.warns(RuntimeWarning):
+                new_index_skt = await finder.find("index.html")
+
+            assert new_index_skt is not index_skt
+            assert await new_index_skt.draw() == "New Index"
+
 
 class InheritanceTestCase:
     @helper.force_sync
@@ -143,6 +1197,24 @@ class IncludeTestCase:
 
 
 class SketchDiscoveryTestCase:
+    @helper.force_sync
+    async def test_relative_path_resolution(self) -> None:
+        finder = SyncSketchFinder(
+            helper.abspath("sketches"), skt_ctx=default_skt_ctx
+        )
+
+        header_skt = await finder.find("header.html")
+        nested_skt = await finder.find("nested/index.html")
+
+        assert await nested_skt.draw() == (
+            "<nav>Nested header.</nav>\n\n"
+            "\n<nav>This will be included in other files.</nav>\n"
+        )
+
+        # Different spellings of a path share the same sketch.
+        assert await finder.find("/nested/../header.html") is header_skt
+        assert header_skt._path == helper.abspath("sketches/header.html")
+
     @helper.force_sync
     async def test_traversal_prevention_for_sync_finder(self) -> None:
         finder = SyncSketchFinder(
@@ -166,3 +1238,23 @@ class SketchDiscoveryTestCase:
                 await finder._find_abs_path(
                     "../hijack.html", helper.abspath("sketches/main.html")
                 )
+
+
+class StreamTestCase:
+    @helper.force_sync
+    async def test_stream_inheritance(self) -> None:
+        finder = SyncSketchFinder(
+            helper.abspath("sketches"), skt_ctx=default_skt_ctx
+        )
+
+        skt = await finder.find("streaming.html")
+
+        chunks = [chunk async for chunk in skt.stream()]
+
+        assert chunks == [
+            "<head>Title</head>\n",
+            "Content",
+            "More Content\n\n\n\nBody\n<footer>",
+            "</footer>\n",
+        ]
+        assert "".join(chunks) == await skt.draw()
@@ -22,7 +22,7 @@ import time
 
 import pytest
 
-from sketchbook import Sketch
+from sketchbook import Sketch, SketchSyntaxError
 
 _TEST_CURIO = bool(os.environ.get("TEST_CURIO", False))
 
@@ -135,3 +135,85 @@ class NothingTestCase:
     @helper.force_sync
     async def test_empty_sketch(self) -> None:
         await Sketch("", skt_ctx=default_skt_ctx).draw()
+
+
+class CompileOnceTestCase:
+    @helper.force_sync
+    async def test_draw_fns_reused(self) -> None:
+        skt = Sketch(
+            "<% block a %><%= b %><% end %><%= c %>", skt_ctx=default_skt_ctx
+        )
+
+        assert await skt.draw(b="1", c="2") == "12"
+        draw_fns = skt._draw_fns
+
+        assert await skt.draw(b="3", c="4") == "34"
+        assert skt._draw_fns is draw_fns
+
+    @helper.force_sync
+    async def test_globals_isolated(self) -> None:
+        skt = Sketch(
+            "<% global a %><% let a = b %><%= a %>", skt_ctx=default_skt_ctx
+        )
+
+        skt_globals = {"b": "1"}
+        assert await skt._get_runtime(skt_globals)._draw() is None
+        assert skt_globals["a"] == "1"
+
+        assert await skt.draw(b="2") == "2"
+        assert "a" not in skt._draw_fns[0].__globals__
+
+
+class StreamTestCase:
+    @helper.force_sync
+    async def test_stream_chunks(self) -> None:
+        skt = Sketch(
+            "a<% flush %><% for i in range(2) %>b<% flush %><% end %>c",
+            skt_ctx=default_skt_ctx,
+        )
+
+        assert [chunk async for chunk in skt.stream()] == ["a", "b", "b", "c"]
+        assert await skt.draw() == "abbc"
+
+    @helper.force_sync
+    async def test_stream_before_await(self) -> None:
+        awaited = []
+
+        async def get_content() -> str:
+            awaited.append(True)
+
+            if _TEST_CURIO:
+                await curio.sleep(0)
+
+            else:
+                await asyncio.sleep(0)
+
+            return "content"
+
+        skt = Sketch(
+            "<head></head><% flush %><%= await get_content() %>",
+            skt_ctx=default_skt_ctx,
+        )
+
+        chunks = []
+        async for chunk in skt.stream(get_content=get_content):
+            chunks.append((chunk, bool(awaited)))
+
+        assert chunks == [("<head></head>", False), ("content", True)]
+
+    @helper.force_sync
+    async def test_stream_error(self) -> None:
+        skt = Sketch(
+            "a<% flush %><% raise RuntimeError %>", skt_ctx=default_skt_ctx
+        )
+
+        chunks = []
+        with pytest.raises(RuntimeError):
+            async for chunk in skt.stream():
+                chunks.append(chunk)
+
+        assert chunks == ["a"]
+
+    def test_flush_with_argument(self) -> None:
+        with pytest.raises(SketchSyntaxError):
+            Sketch("<% flush a %>", skt_ctx=default_skt_ctx)
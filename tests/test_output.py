@@ -104,3 +104,108 @@ class OutputTestCase:
         )
 
         assert await skt.draw(a=12345) == "The result is 12346."
+
+
+class OutputBufferTestCase:
+    def test_join_nested_segments(self) -> None:
+        from sketchbook.runtime import _join_segments
+
+        assert _join_segments([]) == ""
+        assert _join_segments(["a", ["b", [], ["c"]], "d", [["e"]]]) == (
+            "abcde"
+        )
+
+    @helper.force_sync
+    async def test_block_output_in_place(self) -> None:
+        skt = Sketch(
+            "a<% block b %>b<% block c %>c<% end %>b<% end %>a",
+            skt_ctx=default_skt_ctx,
+        )
+
+        assert await skt.draw() == "abcba"
+
+
+class PlainOutputTestCase:
+    @helper.force_sync
+    async def test_merge_plain_strs(self) -> None:
+        from sketchbook import printer
+
+        skt = Sketch(
+            "a<%# comment %>b<% if True %>c<%# comment %>d<% end %>e",
+            skt_ctx=default_skt_ctx,
+        )
+
+        py_printer = printer.PythonPrinter(path=skt._path)
+        skt._root.print_code(py_printer)
+
+        assert "_skt_append('ab')" in py_printer.plain_code
+        assert "_skt_append('cd')" in py_printer.plain_code
+
+        assert await skt.draw() == "abcde"
+
+    @helper.force_sync
+    async def test_escape_fns_bound_once(self) -> None:
+        def _upper_fn(s: str) -> str:
+            return s.upper()
+
+        if _TEST_CURIO:
+            skt_ctx = CurioSketchContext(custom_escape_fns={"html": _upper_fn})
+
+        else:
+            skt_ctx = AsyncioSketchContext(
+                custom_escape_fns={"html": _upper_fn}
+            )
+
+        skt = Sketch("<%html= a %><%= a %>", skt_ctx=skt_ctx)
+
+        assert await skt.draw(a="<a>") == "<A>&lt;a&gt;"
+
+        draw_body_fn = skt._draw_fns[0]
+        assert _upper_fn in [
+            cell.cell_contents for cell in draw_body_fn.__closure__
+        ]
+
+
+class BuiltinEscapeFnsTestCase:
+    def test_same_as_stdlib(self) -> None:
+        import html
+        import urllib.parse
+
+        from sketchbook.escaping import builtin_escape_fns
+
+        for unsafe_str in (
+            "",
+            "plain",
+            "/path/to-file_1.txt~",
+            "<a href='#'>\"Tom\" & Jerry</a>",
+            "&amp;",
+            "John Smith",
+            "中文 / 日本語",
+        ):
+            assert builtin_escape_fns["html"](unsafe_str) == html.escape(
+                unsafe_str
+            )
+            assert builtin_escape_fns["url"](
+                unsafe_str
+            ) == urllib.parse.quote_plus(unsafe_str)
+            assert builtin_escape_fns["url_without_plus"](
+                unsafe_str
+            ) == urllib.parse.quote(unsafe_str)
+
+    @helper.force_sync
+    async def test_escaped_str(self) -> None:
+        from sketchbook import EscapedStr, mark_as_escaped
+
+        escaped_str = mark_as_escaped("<b>&amp;</b>")
+        assert isinstance(escaped_str, EscapedStr)
+        assert mark_as_escaped(escaped_str) is escaped_str
+
+        skt = Sketch(
+            "<%= a %>|<%h= a %>|<%= a + '&' %>|<%u= a %>",
+            skt_ctx=default_skt_ctx,
+        )
+
+        assert await skt.draw(a=escaped_str) == (
+            "<b>&amp;</b>|<b>&amp;</b>|&lt;b&gt;&amp;amp;&lt;/b&gt;&amp;|"
+            "%3Cb%3E%26amp%3B%3C%2Fb%3E"
+        )
@@ -15,6 +15,7 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
+from typing import Any, Optional
 import os
 
 import pytest
@@ -73,6 +74,16 @@ No, it's not me!
         assert await skt.draw(a=True) == "\nHello, it's me!\n"
         assert await skt.draw(a=False) == "\nNo, it's not me!\n"
 
+    @helper.force_sync
+    async def test_escaped_marks(self) -> None:
+        skt = Sketch(
+            "<%%%> %%> <%% <%= '%%>' %>\n<%r= '<%%' %><%%= a %>",
+            skt_ctx=default_skt_ctx,
+        )
+
+        # <%% is only an escape outside statements, and %%> inside them.
+        assert await skt.draw() == "<%%> %%> <% %&gt;\n<%%<%= a %>"
+
 
 class MalformedSketchTestCase:
     def test_malformed_stmts(self) -> None:
@@ -90,3 +101,86 @@ class MalformedSketchTestCase:
     def test_unknown_stmt(self) -> None:
         with pytest.raises(UnknownStatementError):
             Sketch("<% if anyways %><% fi %>", skt_ctx=default_skt_ctx)
+
+    def test_unterminated_stmts(self) -> None:
+        for content in ("<% if a", "<%= a %%>", "a\n<%r= a\n+ 1 %"):
+            with pytest.raises(
+                SketchSyntaxError, match="Cannot find end mark"
+            ):
+                Sketch(content, skt_ctx=default_skt_ctx)
+
+    def test_error_line_numbers(self) -> None:
+        for content, exc_cls, line_no in (
+            ("line1\nline2\n<% if a", SketchSyntaxError, 3),
+            ("1\n2\n3\n<%= a\n+ 1", SketchSyntaxError, 4),
+            ("a\n<%% b\n<% fi %>", UnknownStatementError, 3),
+            # Lines in multi-line statements are counted.
+            ("a\n<% if a\n%>\nb\n<% what %>", UnknownStatementError, 5),
+            ("a\n<% if a %>\nx\n<% end %>\n<% end %>", SketchSyntaxError, 5),
+            (
+                "x\n<% if a %>\n<% for b in c %>\n<% end %>",
+                SketchSyntaxError,
+                2,
+            ),
+        ):
+            with pytest.raises(exc_cls, match=f"at line {line_no}\\.$"):
+                Sketch(content, skt_ctx=default_skt_ctx)
+
+
+class StatementIndexTestCase:
+    def test_stmt_classes_by_keyword(self) -> None:
+        from sketchbook import statements
+
+        stmt_classes = default_skt_ctx._get_stmt_classes("if")
+        assert [stmt_cls.__name__ for stmt_cls in stmt_classes] == [
+            "_Indent",
+            "_Comment",
+        ]
+
+        stmt_classes = default_skt_ctx._get_stmt_classes("html=")
+        assert issubclass(stmt_classes[-1], statements.BaseOutput)
+
+        stmt_classes = default_skt_ctx._get_stmt_classes("#comment")
+        assert [stmt_cls.__name__ for stmt_cls in stmt_classes] == ["_Comment"]
+
+    @helper.force_sync
+    async def test_overridden_stmt_classes(self) -> None:
+        from sketchbook import statements
+
+        class _Greet(statements.Statement, statements.AppendMixIn):
+            _keywords = ["greet"]
+
+            def __init__(self, line_no: int) -> None:
+                self._line_no = line_no
+
+            @property
+            def line_no(self) -> int:
+                return self._line_no
+
+            @classmethod
+            def try_match(
+                cls, stmt_str: str, skt: Sketch, line_no: int
+            ) -> Optional["_Greet"]:
+                return cls(line_no) if stmt_str == "greet" else None
+
+            def print_code(self, py_printer: Any) -> None:
+                py_printer.writeline('_skt_append("Hello!")', self)
+
+        class _GreetSketchContext(type(default_skt_ctx)):  # type: ignore
+            @property
+            def stmt_classes(self) -> Any:
+                return [_Greet, *super().stmt_classes]
+
+        skt = Sketch("<% greet %>", skt_ctx=_GreetSketchContext())
+
+        assert await skt.draw() == "Hello!"
+
+    @helper.force_sync
+    async def test_stmts_after_keywords(self) -> None:
+        skt = Sketch(
+            "<%#comment%><%= a %><%html= a %><%h= a %><% let b = a %>"
+            "<%r= b %>",
+            skt_ctx=default_skt_ctx,
+        )
+
+        assert await skt.draw(a="&") == "&amp;&amp;&amp;&"